@@ -1,13 +1,22 @@
 #!/usr/bin/env python3
 """
 Build pipeline tool: .mln -> .masm (mlc) -> .mobj (myas) -> linked .mbin (mllinker)
-Supports recursive source discovery with exclusions.
+Supports recursive source discovery with exclusions; directory listings are
+cached in <build-dir>/.scan_manifest.json and reused while directory mtimes
+are unchanged. Units whose input and tool are unchanged since the last build
+(recorded in <build-dir>/.unit_state.json) are not recompiled or reassembled.
+With --map/--budget the linked objects are summarised in a link map and
+checked against a size budget (see linkmap.py); exceeding it fails the build.
 """
 
 import argparse
+import hashlib
+import json
 import os
+import re
 import shutil
 import subprocess
+import time
 from pathlib import Path
 
 import sys
@@ -16,6 +25,8 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 from tools.project_paths import MYASSEMBLER_DIR, MYLANGCOMPILER_DIR, MYLINKER_DIR, REPO_ROOT
 
+import linkmap
+
 
 def run(cmd, cwd=None):
     print("+ " + " ".join(str(c) for c in cmd))
@@ -26,54 +37,221 @@ def norm_rel(p: str) -> str:
     return p.replace("\\", "/").strip("/")
 
 
-def should_exclude(rel: str, excludes) -> bool:
-    if not rel:
-        return False
-    rel = norm_rel(rel)
-    for ex in excludes:
-        if not ex:
-            continue
-        exn = norm_rel(ex)
-        if not exn:
-            continue
-        if "/" in exn:
-            if rel == exn or rel.startswith(exn + "/"):
+class ExcludeMatcher:
+    """--exclude patterns compiled once.
+
+    Bare names (no "/") match any path component and live in a set; relative
+    paths match themselves and everything below them via a prefix trie.
+    """
+
+    def __init__(self, excludes):
+        self.names = set()
+        self.trie = {}
+        paths = set()
+        for ex in excludes:
+            exn = norm_rel(ex) if ex else ""
+            if not exn:
+                continue
+            if "/" in exn:
+                paths.add(exn)
+                node = self.trie
+                for part in exn.split("/"):
+                    node = node.setdefault(part, {})
+                node[None] = True
+            else:
+                self.names.add(exn)
+        self.key = sorted(self.names) + sorted(paths)
+
+    def match_parts(self, parts) -> bool:
+        if not parts:
+            return False
+        if self.names and not self.names.isdisjoint(parts):
+            return True
+        node = self.trie
+        for part in parts:
+            node = node.get(part)
+            if node is None:
+                return False
+            if None in node:
                 return True
+        return False
+
+    def __call__(self, rel: str) -> bool:
+        if not rel:
+            return False
+        return self.match_parts(norm_rel(rel).split("/"))
+
+
+def should_exclude(rel: str, excludes) -> bool:
+    if not isinstance(excludes, ExcludeMatcher):
+        excludes = ExcludeMatcher(excludes)
+    return excludes(rel)
+
+
+class ScanManifest:
+    """Persisted directory listings keyed by directory mtime.
+
+    Entries are keyed by the directory and its path relative to the scan root,
+    since exclusions are matched against that relative path. A directory whose
+    mtime is unchanged since the last scan reuses its cached source files and
+    subdirectories instead of being listed again, so an unchanged tree costs
+    one stat per directory.
+
+    As in git's racy-index rule, a listing is not cached while the directory
+    mtime is within RACY_NS of the scan: on filesystems with coarse
+    timestamps (NFS, FAT) a file created in the same tick would otherwise
+    leave the mtime unchanged and never be discovered. Entries for
+    directories that no longer exist are dropped on save.
+    """
+
+    VERSION = 2
+    RACY_NS = 2_000_000_000
+
+    def __init__(self, path, matcher):
+        self.path = Path(path) if path else None
+        self.key = matcher.key
+        self.dirs = {}
+        self.visited = set()
+        self.dirty = False
+        if self.path is None:
+            return
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.VERSION and data.get("excludes") == self.key:
+            self.dirs = data.get("dirs", {})
+
+    def listing(self, dir_path: Path, rel_parts, scan):
+        """Return (files, subdirs) for dir_path, calling scan() only when stale."""
+        key = f"{dir_path}\0{'/'.join(rel_parts)}"
+        self.visited.add(key)
+        mtime = dir_path.stat().st_mtime_ns
+        cached = self.dirs.get(key)
+        if cached and cached["mtime_ns"] == mtime:
+            return cached["files"], cached["subdirs"]
+        now = time.time_ns()
+        files, subdirs = scan()
+        if now - mtime < self.RACY_NS:
+            if self.dirs.pop(key, None) is not None:
+                self.dirty = True
         else:
-            parts = rel.split("/")
-            if exn in parts:
-                return True
-    return False
+            self.dirs[key] = {"mtime_ns": mtime, "files": files, "subdirs": subdirs}
+            self.dirty = True
+        return files, subdirs
+
+    def prune(self):
+        """Drop entries of directories that were not visited and no longer exist."""
+        for key in [k for k in self.dirs if k not in self.visited]:
+            if not os.path.isdir(key.split("\0", 1)[0]):
+                del self.dirs[key]
+                self.dirty = True
 
+    def save(self):
+        if self.path is None:
+            return
+        self.prune()
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": self.VERSION, "excludes": self.key, "dirs": self.dirs}))
+        os.replace(tmp, self.path)
 
-def collect_sources(paths, excludes, include_masm):
+
+def scan_dir(dir_path: Path, rel_parts, matcher):
+    """List one directory: (source file names, non-excluded subdir names)."""
+    files = []
+    subdirs = []
+    with os.scandir(dir_path) as it:
+        for entry in it:
+            parts = rel_parts + (entry.name,)
+            if entry.is_dir():
+                # like os.walk, symlinked directories are not followed
+                if not entry.is_symlink() and not matcher.match_parts(parts):
+                    subdirs.append(entry.name)
+            elif entry.name.endswith((".mln", ".masm")) and not matcher.match_parts(parts):
+                files.append(entry.name)
+    return sorted(files), sorted(subdirs)
+
+
+class UnitState:
+    """Per-unit build records so unchanged units skip mlc/myas.
+
+    A unit is up to date when all of its outputs exist and its input content
+    hash, tool binary stamp and extra arguments match the last recorded run.
+    mlc resolves `import` by package name across the .mln files next to the
+    importing unit, so a unit with imports also records a hash of its sibling
+    .mln files and is recompiled when any of them changes.
+    """
+
+    IMPORT_RE = re.compile(rb"^\s*import\b", re.M)
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._siblings = {}
+        try:
+            self.units = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.units = {}
+
+    def sibling_hashes(self, directory: Path):
+        """{name: sha256} of every .mln file in directory, computed once per build."""
+        if directory not in self._siblings:
+            self._siblings[directory] = {
+                p.name: hashlib.sha256(p.read_bytes()).hexdigest() for p in sorted(directory.glob("*.mln"))
+            }
+        return self._siblings[directory]
+
+    def stamp(self, src: Path, tool: Path, extra):
+        data = src.read_bytes()
+        st = tool.stat()
+        stamp = {
+            "input": hashlib.sha256(data).hexdigest(),
+            "tool": f"{st.st_size}:{st.st_mtime_ns}",
+            "args": [str(a) for a in extra],
+        }
+        if src.suffix == ".mln" and self.IMPORT_RE.search(data):
+            siblings = {k: v for k, v in self.sibling_hashes(src.parent).items() if k != src.name}
+            stamp["imports"] = hashlib.sha256(json.dumps(siblings, sort_keys=True).encode()).hexdigest()
+        return stamp
+
+    def up_to_date(self, outputs, stamp) -> bool:
+        if not all(Path(o).exists() for o in outputs):
+            return False
+        return self.units.get(str(outputs[0])) == stamp
+
+    def record(self, outputs, stamp):
+        self.units[str(outputs[0])] = stamp
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.units, indent=2, sort_keys=True))
+        os.replace(tmp, self.path)
+
+
+def collect_sources(paths, excludes, include_masm, manifest_path=None):
     sources = []
+    matcher = excludes if isinstance(excludes, ExcludeMatcher) else ExcludeMatcher(excludes)
+    manifest = ScanManifest(manifest_path, matcher)
+
+    def walk(root: Path, dir_path: Path, rel_parts):
+        files, subdirs = manifest.listing(dir_path, rel_parts, lambda: scan_dir(dir_path, rel_parts, matcher))
+        for name in files:
+            rel_file = Path(*rel_parts, name)
+            fpath = dir_path / name
+            if fpath.suffix == ".mln":
+                sources.append((fpath, rel_file, "ml"))
+            elif fpath.suffix == ".masm" and include_masm:
+                sources.append((fpath, rel_file, "masm"))
+        for d in subdirs:
+            walk(root, dir_path / d, rel_parts + (d,))
 
     for p in paths:
         p = p.resolve()
         if p.is_dir():
-            for root, dirs, files in os.walk(p, topdown=True):
-                root_path = Path(root)
-                rel_root = root_path.relative_to(p)
-                rel_root_str = "" if rel_root == Path(".") else norm_rel(str(rel_root))
-
-                # prune excluded dirs
-                keep_dirs = []
-                for d in dirs:
-                    rel_dir = d if not rel_root_str else f"{rel_root_str}/{d}"
-                    if not should_exclude(rel_dir, excludes):
-                        keep_dirs.append(d)
-                dirs[:] = keep_dirs
-
-                for name in files:
-                    rel_file = name if not rel_root_str else f"{rel_root_str}/{name}"
-                    if should_exclude(rel_file, excludes):
-                        continue
-                    fpath = root_path / name
-                    if fpath.suffix == ".mln":
-                        sources.append((fpath, Path(rel_file), "ml"))
-                    elif fpath.suffix == ".masm" and include_masm:
-                        sources.append((fpath, Path(rel_file), "masm"))
+            walk(p, p, ())
         else:
             rel_name = p.name
             if p.suffix == ".mln":
@@ -83,6 +261,7 @@ def collect_sources(paths, excludes, include_masm):
             else:
                 print(f"[WARN] Skip unsupported file: {p}")
 
+    manifest.save()
     return sources
 
 
@@ -96,6 +275,9 @@ def main():
     parser.add_argument("--entry", help="Entry function name mapped to __START__ (mlc)")
     parser.add_argument("--masm", action="store_true", help="Include .masm when scanning directories")
     parser.add_argument("--clean", action="store_true", help="Clean build directory before build")
+    parser.add_argument("--map", help="Write a link map of the linked objects (.json for JSON); "
+                        "map problems are warnings unless --budget is given")
+    parser.add_argument("--budget", help="JSON size budget for the linked image; exceeding it fails the build")
     args = parser.parse_args()
 
     repo = REPO_ROOT
@@ -110,8 +292,16 @@ def main():
         shutil.rmtree(build_dir)
     build_dir.mkdir(parents=True, exist_ok=True)
 
+    budget = None
+    if args.budget:
+        try:
+            budget = linkmap.load_budget(args.budget)
+        except (OSError, ValueError) as e:
+            print(f"[ERROR] {e}")
+            return 1
+
     src_paths = [Path(p).resolve() for p in args.sources]
-    sources = collect_sources(src_paths, args.exclude, args.masm)
+    sources = collect_sources(src_paths, args.exclude, args.masm, build_dir / ".scan_manifest.json")
 
     if not sources:
         print("[ERROR] No sources found.")
@@ -131,17 +321,21 @@ def main():
         out_map[out_masm] = src
 
     masm_outputs = []
+    units = UnitState(build_dir / ".unit_state.json")
+    skipped = 0
 
     # Compile/Copy to .masm
     for src, rel, stype in sources:
         if stype == "ml":
             out_masm = build_dir / rel.with_suffix(".masm")
             out_masm.parent.mkdir(parents=True, exist_ok=True)
-            cmd = [mlc]
-            if args.entry:
-                cmd += ["-entry", args.entry]
-            cmd += [src, out_masm]
-            run(cmd, cwd=repo)
+            entry_args = ["-entry", args.entry] if args.entry else []
+            stamp = units.stamp(src, mlc, entry_args)
+            if units.up_to_date([out_masm], stamp):
+                skipped += 1
+            else:
+                run([mlc] + entry_args + [src, out_masm], cwd=repo)
+                units.record([out_masm], stamp)
             masm_outputs.append(out_masm)
         elif stype == "masm":
             out_masm = build_dir / rel
@@ -155,8 +349,16 @@ def main():
     for masm in masm_outputs:
         out_mbin = masm.with_suffix(".mbin")
         out_mobj = masm.with_suffix(".mobj")
-        run([myas, masm, out_mbin, "--obj", out_mobj], cwd=repo)
+        stamp = units.stamp(masm, myas, [])
+        if units.up_to_date([out_mobj, out_mbin], stamp):
+            skipped += 1
+        else:
+            run([myas, masm, out_mbin, "--obj", out_mobj], cwd=repo)
+            units.record([out_mobj, out_mbin], stamp)
         mobj_paths.append(out_mobj)
+    units.save()
+    if skipped:
+        print(f"[INFO] {skipped} unit step(s) up to date")
 
     if not mobj_paths:
         print("[ERROR] No .mobj outputs generated.")
@@ -173,6 +375,32 @@ def main():
     
     run([mllinker, out_path] + unique_mobj, cwd=repo)
     print(f"Linked output: {out_path}")
+
+    if args.map or budget is not None:
+        # The map is only a report: without a budget to enforce, a map that
+        # cannot be built or written must not fail an otherwise good link.
+        try:
+            link_map = linkmap.build_map(unique_mobj)
+        except (OSError, ValueError) as e:
+            if budget is None:
+                print(f"[WARN] link map skipped: {e}")
+                return 0
+            print(f"[ERROR] link map: {e}")
+            return 1
+        if args.map:
+            try:
+                linkmap.write_map(link_map, args.map, out_path)
+            except OSError as e:
+                print(f"[WARN] link map not written: {e}")
+            else:
+                print(f"Link map: {args.map} (text {link_map['text_size']}, data {link_map['data_size']} bytes)")
+        if budget is not None:
+            violations = linkmap.check_budget(link_map, budget, out_path)
+            for v in violations:
+                print(f"[ERROR] size budget exceeded: {v}")
+            if violations:
+                return 1
+            print(f"[INFO] within size budget {args.budget}")
     return 0
 
 
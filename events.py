@@ -0,0 +1,231 @@
+"""
+Structured run events (JSON lines) and end-of-run latency metrics.
+
+When start() has been called, every harness step emits step_start and
+step_finish events (tool, stage, duration, exit code, status), and the runner
+emits job_queued/job_start/job_finish with queue wait times. finish() writes
+metrics.json with latency histograms per stage and per tool, queue wait and
+job histograms, counters and worker utilization. Without start() everything is a no-op.
+
+Each event line carries "ts" (epoch seconds), "t" (seconds since start),
+"event" and the event's own fields.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from stats import percentile
+
+# Histogram bucket upper bounds in milliseconds; a final bucket takes the rest.
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000)
+
+STAGES = {
+    "make": "build",
+    "mlc": "compile",
+    "myas": "assemble",
+    "mllinker": "link",
+    "myemu": "emulate",
+}
+
+_lock = threading.Lock()
+_local = threading.local()
+_stream = None
+_metrics = None
+_t0 = 0.0
+
+
+class Histogram:
+    """Latency samples with fixed log-scale buckets and exact percentiles."""
+
+    def __init__(self):
+        self.samples = []
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def to_json(self):
+        samples = sorted(self.samples)
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for s in samples:
+            ms = s * 1000
+            counts[next((i for i, b in enumerate(BUCKETS_MS) if ms <= b), len(BUCKETS_MS))] += 1
+        buckets = {f"le_{b}ms": c for b, c in zip(BUCKETS_MS, counts)}
+        buckets["inf"] = counts[-1]
+        out = {"count": len(samples), "total_s": round(sum(samples), 6), "buckets": buckets}
+        if samples:
+            out.update(
+                min_s=round(samples[0], 6),
+                p50_s=round(percentile(samples, 50), 6),
+                p95_s=round(percentile(samples, 95), 6),
+                max_s=round(samples[-1], 6),
+            )
+        return out
+
+
+class Metrics:
+    def __init__(self):
+        self.stages = {}
+        self.tools = {}
+        self.queue_wait = Histogram()
+        self.jobs = Histogram()
+        self.busy = {}
+        self.steps = 0
+        self.failed_steps = 0
+        self.first_queued = None
+        self.last_finished = None
+        self.counters = {}
+
+    def step(self, tool, stage, seconds, ok):
+        self.stages.setdefault(stage, Histogram()).add(seconds)
+        self.tools.setdefault(tool, Histogram()).add(seconds)
+        self.steps += 1
+        self.failed_steps += not ok
+
+    def to_json(self, workers):
+        span = 0.0
+        if self.first_queued is not None and self.last_finished is not None:
+            span = self.last_finished - self.first_queued
+        busy = sum(self.busy.values())
+        return {
+            "steps": self.steps,
+            "failed_steps": self.failed_steps,
+            "stages": {k: h.to_json() for k, h in sorted(self.stages.items())},
+            "tools": {k: h.to_json() for k, h in sorted(self.tools.items())},
+            "queue_wait": self.queue_wait.to_json(),
+            "jobs": self.jobs.to_json(),
+            "counters": dict(sorted(self.counters.items())),
+            "workers": {
+                "count": workers,
+                "test_phase_s": round(span, 6),
+                "busy_s": round(busy, 6),
+                "utilization": round(busy / (workers * span), 4) if workers and span > 0 else None,
+                "per_worker_busy_s": {k: round(v, 6) for k, v in sorted(self.busy.items())},
+            },
+        }
+
+
+def start(path):
+    """Open the event stream at `path` (truncated) and reset the metrics."""
+    global _stream, _metrics, _t0
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        _stream = open(path, "w", buffering=1)
+        _metrics = Metrics()
+        _t0 = time.monotonic()
+    emit("stream_start", pid=os.getpid())
+
+
+def emit(event, **fields):
+    if _stream is None:
+        return
+    now = time.monotonic()
+    record = {"ts": round(time.time(), 6), "t": round(now - _t0, 6), "event": event}
+    record.update(fields)
+    line = json.dumps(record, default=str)
+    with _lock:
+        if _stream is not None:
+            _stream.write(line + "\n")
+
+
+def count(name, n=1):
+    """Add n to the named counter reported in metrics.json."""
+    if _metrics is None:
+        return
+    with _lock:
+        if _metrics is not None:
+            _metrics.counters[name] = _metrics.counters.get(name, 0) + n
+
+
+def current_job():
+    return getattr(_local, "job", None)
+
+
+def job_queued(job, cases):
+    """Record that a job was submitted; returns the token passed to job_start()."""
+    now = time.monotonic()
+    if _metrics is not None:
+        with _lock:
+            if _metrics.first_queued is None:
+                _metrics.first_queued = now
+    emit("job_queued", job=job, cases=cases)
+    return now
+
+
+def job_start(job, queued_at):
+    """Mark the calling worker thread as running `job`; returns its start time."""
+    now = time.monotonic()
+    _local.job = job
+    wait = now - queued_at
+    if _metrics is not None:
+        with _lock:
+            _metrics.queue_wait.add(wait)
+    emit("job_start", job=job, queue_wait_s=round(wait, 6), worker=threading.current_thread().name)
+    return now
+
+
+def job_finish(job, started_at):
+    now = time.monotonic()
+    _local.job = None
+    duration = now - started_at
+    if _metrics is not None:
+        worker = threading.current_thread().name
+        with _lock:
+            _metrics.jobs.add(duration)
+            _metrics.busy[worker] = _metrics.busy.get(worker, 0.0) + duration
+            _metrics.last_finished = now
+    emit("job_finish", job=job, duration_s=round(duration, 6))
+
+
+def step_start(command, description):
+    """Emit step_start for a subprocess step; returns the step record for step_finish()."""
+    tool = Path(command[0]).name if command else ""
+    step = {
+        "job": current_job(),
+        "tool": tool,
+        "stage": STAGES.get(tool, "other"),
+        "description": description,
+        "start": time.monotonic(),
+        "exit_code": None,
+        "status": "error",
+    }
+    emit("step_start", job=step["job"], tool=tool, stage=step["stage"], description=description,
+         command=command)
+    return step
+
+
+def step_finish(step):
+    duration = time.monotonic() - step["start"]
+    if _metrics is not None:
+        with _lock:
+            _metrics.step(step["tool"], step["stage"], duration, step["status"] == "ok")
+    emit("step_finish", job=step["job"], tool=step["tool"], stage=step["stage"],
+         description=step["description"], duration_s=round(duration, 6),
+         exit_code=step["exit_code"], status=step["status"])
+
+
+def finish(metrics_path, workers, **summary):
+    """Write the metrics file, emit stream_end and close the stream (even if writing fails)."""
+    global _stream, _metrics
+    if _stream is None:
+        return
+    wall = time.monotonic() - _t0
+    data = {"wall_s": round(wall, 6)}
+    data.update(summary)
+    try:
+        with _lock:
+            data.update(_metrics.to_json(workers))
+        metrics_path = Path(metrics_path)
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = metrics_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, metrics_path)
+    finally:
+        emit("stream_end", wall_s=round(wall, 6))
+        with _lock:
+            _stream.close()
+            _stream = None
+            _metrics = None
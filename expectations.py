@@ -0,0 +1,139 @@
+"""
+Register and memory expectations for emulator runs.
+
+Expectations can be listed in a test case or written inline in .mln sources:
+
+    // expect: R1 = 42, R2 = 0x10
+    // expect: g_a = 42          (32-bit word at data symbol g_a)
+    // expect: g_b:1 = 'Z'       (1 byte at g_b)
+    // expect: g_arr+2 = 9       (word at g_arr + 2)
+    // expect: [0x2000]:2 = 7    (2 bytes at an absolute address)
+
+Addresses and symbol offsets are emulator addresses (mobj.ADDR_UNIT bytes
+each; word-addressed by default, so g_arr+2 is the third word); widths are
+bytes. Numbers are decimal unless prefixed with 0x, and values are compared
+as 32-bit (width-masked) so R1 = -1 matches 0xffffffff. Items are separated by commas outside character literals (`c:1 = ','`
+works). Register names are case-sensitive: only R<n> is a register, so `r2`
+names a data symbol.
+
+Symbol checks rely on mobj.link_layout and the memdump text format; several
+register values per run rely on myemu printing one line per repeated --reg
+flag. testGlobalScalar.mln exercises the symbol checks.
+
+Inline expectations are discovered through ExpectIndex, a JSON cache keyed by
+file size and mtime so unchanged sources are not re-read.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+_ITEM_SPLIT_RE = re.compile(r"(?:'(?:\\.|[^'\\])'|[^,'])+|'")
+_LINE_RE = re.compile(r"//\s*expect:\s*(.+?)\s*$")
+_NUM = r"(?:0[xX][0-9A-Fa-f]+|\d+)"
+_ITEM_RE = re.compile(
+    rf"^(?:(?P<reg>R\d+)"
+    rf"|\[(?P<addr>{_NUM})\]"
+    rf"|(?P<sym>[A-Za-z_]\w*)(?:\+(?P<off>{_NUM}))?)"
+    rf"(?::(?P<width>[1248]))?\s*=\s*(?P<value>'(?:\\.|[^'])'|-?{_NUM})$"
+)
+
+
+def parse_number(text):
+    """Decimal, or hex with a 0x prefix (leading zeros allowed in both)."""
+    sign = -1 if text.startswith("-") else 1
+    text = text.lstrip("-")
+    return sign * (int(text[2:], 16) if text[:2].lower() == "0x" else int(text, 10))
+
+
+def parse_value(text):
+    if text.startswith("'"):
+        body = text[1:-1]
+        return ord(body.encode().decode("unicode_escape"))
+    return parse_number(text)
+
+
+def parse_item(item):
+    """Parse "target = value" into an expectation dict."""
+    m = _ITEM_RE.match(item.strip())
+    if not m:
+        raise ValueError(f"bad expectation '{item.strip()}'")
+    value = parse_value(m.group("value"))
+    width = int(m.group("width")) if m.group("width") else 4
+    if m.group("reg"):
+        return {"kind": "reg", "target": m.group("reg"), "value": value}
+    if m.group("addr"):
+        return {"kind": "mem", "target": parse_number(m.group("addr")), "width": width, "value": value}
+    return {"kind": "sym", "target": m.group("sym"), "offset": parse_number(m.group("off") or "0"),
+            "width": width, "value": value}
+
+
+def split_items(text):
+    """Split an expectation list on commas that are not inside a character literal."""
+    items = _ITEM_SPLIT_RE.findall(text)
+    if "'" in items:
+        raise ValueError(f"unbalanced quote in '{text.strip()}'")
+    return [item for item in items if item.strip()]
+
+
+def parse_source(text):
+    """Return all inline expectations of one source file."""
+    found = []
+    for line in text.splitlines():
+        m = _LINE_RE.search(line)
+        if not m:
+            continue
+        for item in split_items(m.group(1)):
+            found.append(parse_item(item))
+    return found
+
+
+def describe(exp):
+    if exp["kind"] == "reg":
+        return exp["target"]
+    if exp["kind"] == "mem":
+        return f"[0x{exp['target']:x}]:{exp['width']}"
+    off = f"+{exp['offset']:#x}" if exp["offset"] else ""
+    return f"{exp['target']}{off}:{exp['width']}"
+
+
+class ExpectIndex:
+    """Cached map of source file -> inline expectations."""
+
+    VERSION = 3
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        self.entries = data.get("entries", {}) if data.get("version") == self.VERSION else {}
+
+    def lookup(self, src: Path):
+        st = src.stat()
+        key = str(src)
+        stamp = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            cached = self.entries.get(key)
+            if cached and cached["stamp"] == stamp:
+                return cached["expect"]
+        expect = parse_source(src.read_text(errors="replace"))
+        with self._lock:
+            self.entries[key] = {"stamp": stamp, "expect": expect}
+            self.dirty = True
+        return expect
+
+    def save(self):
+        with self._lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps({"version": self.VERSION, "entries": self.entries}, indent=2, sort_keys=True))
+            os.replace(tmp, self.path)
+            self.dirty = False
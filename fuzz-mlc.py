@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Differential fuzzing of mlc against a Python reference evaluator.
+
+Random programs are built and run through the full toolchain on all cores;
+R1 is compared with the reference result. Failures are minimized and written
+to outputs/fuzz/failures/<hash>.mln with a "// expect: R1 = ..." line.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.project_paths import MYTESTER_DIR
+
+import harness
+from fuzz.driver import Fuzzer
+from harness import CYAN, GREEN, RED, StepLog, YELLOW, run_step, status_line
+from toolchain import Toolchain
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Differential fuzzer for the MyLang compiler.")
+    parser.add_argument("--count", type=int, default=1000, help="Programs to generate (default: 1000)")
+    parser.add_argument("--time", type=float, help="Stop after this many seconds instead of --count")
+    parser.add_argument("--seed", type=int, default=int(time.time()), help="First seed (default: current time)")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 4, help="Parallel programs")
+    parser.add_argument("--max-depth", type=int, default=3, help="Maximum expression depth")
+    parser.add_argument("--max-stmts", type=int, default=8, help="Maximum top-level statements")
+    parser.add_argument("--no-minimize", action="store_true", help="Store failures without minimizing them")
+    parser.add_argument("--out", default=str(MYTESTER_DIR / "outputs" / "fuzz"), help="Corpus and failure directory")
+    parser.add_argument("--verbose", action="store_true", help="Show step-by-step command progress")
+    args = parser.parse_args()
+
+    harness.VERBOSE = args.verbose
+
+    status_line("SETUP", "build toolchain")
+    build_log = StepLog(Path(args.out) / "BUILD.log")
+    actions = Toolchain(["mlc", "myas", "mllinker", "myemu"]).build(
+        lambda cmd, desc, **kw: run_step(cmd, desc, build_log, [], cancellable=False, **kw)
+    )
+    build_log.flush()
+    if any(action == "failed" for _, action, _ in actions):
+        status_line("FATAL", f"build failed; see {build_log.path}", RED)
+        raise SystemExit(1)
+
+    fuzzer = Fuzzer(
+        args.out, args.jobs,
+        gen_args={"max_depth": args.max_depth, "max_stmts": args.max_stmts},
+        do_minimize=not args.no_minimize,
+    )
+    if args.time:
+        seeds = iter(range(args.seed, sys.maxsize))
+        deadline = time.monotonic() + args.time
+    else:
+        seeds = range(args.seed, args.seed + args.count)
+        deadline = None
+
+    status_line("RUN", f"seed {args.seed}, {args.jobs} worker(s)", CYAN)
+    start = time.monotonic()
+    found = fuzzer.run(seeds, deadline)
+    elapsed = time.monotonic() - start
+    stats = fuzzer.stats
+    rate = stats["run"] / elapsed * 60 if elapsed else 0.0
+    status_line(
+        "DONE",
+        f"{stats['run']} program(s) in {elapsed:.1f}s ({rate:.0f}/min), {stats['dup']} duplicate(s) skipped, "
+        f"{stats['fail']} failing, {len(found)} new",
+        GREEN if not found else YELLOW,
+    )
+    raise SystemExit(1 if found else 0)
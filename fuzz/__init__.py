@@ -0,0 +1,8 @@
+"""
+Differential fuzzer for mlc.
+
+Random well-typed .mln programs are generated as small ASTs (gen), rendered to
+source and evaluated by a Python reference interpreter (program), then run
+through mlc/myas/mllinker/myemu (driver). Mismatches are minimized (minimize)
+and stored under outputs/fuzz/.
+"""
@@ -0,0 +1,178 @@
+"""
+Runs fuzzer programs through mlc -> myas -> mllinker -> myemu across a thread
+pool and records minimized failures.
+"""
+
+import hashlib
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from fuzz.gen import generate
+from fuzz.minimize import minimize
+from fuzz.program import evaluate, render
+import harness
+from harness import RED, StepLog, run_step, scratch_root, status_line
+from suites.mlc import ASM_PATH, CC_PATH, EMU_PATH, EMU_TIMEOUT_SEC, LINKER_PATH
+
+
+def source_hash(source):
+    return hashlib.sha256(source.encode()).hexdigest()[:16]
+
+
+def run_program(source, work_dir, log):
+    """Build and run one program; return ("ok", R1) or (failure kind, detail)."""
+    src = work_dir / "fuzz.mln"
+    asm = work_dir / "fuzz.masm"
+    prelink = work_dir / "fuzz.prelink.mbin"
+    obj = work_dir / "fuzz.mobj"
+    binary = work_dir / "fuzz.mbin"
+    src.write_text(source)
+    outcomes = []
+    steps = [
+        ("mlc", [CC_PATH, src, asm], None),
+        ("myas", [ASM_PATH, asm, prelink, "--obj", obj], None),
+        ("mllinker", [LINKER_PATH, binary, obj], None),
+        ("myemu", [EMU_PATH, "-i", binary, "--reg", "R1"], EMU_TIMEOUT_SEC),
+    ]
+    output = None
+    for name, cmd, timeout in steps:
+        output = run_step(cmd, name, log, outcomes, timeout=timeout, cwd=work_dir)
+        if output is None:
+            kind = "timeout" if any("timed out" in o for o in outcomes) else "crash"
+            return f"{kind}:{name}", outcomes[0] if outcomes else ""
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    try:
+        return "ok", int(lines[-1].split()[-1], 0) & 0xFFFFFFFF
+    except (IndexError, ValueError):
+        return "crash:output", lines[-1] if lines else "no output"
+
+
+class Fuzzer:
+    def __init__(self, out_dir, jobs, gen_args=None, do_minimize=True):
+        self.out_dir = Path(out_dir)
+        self.jobs = jobs
+        self.gen_args = gen_args or {}
+        self.do_minimize = do_minimize
+        self.failures_dir = self.out_dir / "failures"
+        self.corpus_path = self.out_dir / "corpus.txt"
+        self.local = threading.local()
+        self.work_dirs = []
+        self.lock = threading.Lock()
+        self.seen = set()
+        if self.corpus_path.exists():
+            self.seen.update(self.corpus_path.read_text().split())
+        self.new_seen = []
+        self.known_failures = {p.stem for p in self.failures_dir.glob("*.mln")}
+        self.stats = {"run": 0, "dup": 0, "fail": 0, "new_fail": 0}
+
+    def work_dir(self):
+        if not hasattr(self.local, "dir"):
+            self.local.dir = Path(tempfile.mkdtemp(prefix="mytester-fuzz-", dir=scratch_root()))
+            with self.lock:
+                self.work_dirs.append(self.local.dir)
+        return self.local.dir
+
+    def classify(self, program, expected):
+        """Return (kind, detail, log); kind "ok" means the toolchain agreed."""
+        log = StepLog(self.work_dir() / "fuzz.log")
+        kind, detail = run_program(render(program), self.work_dir(), log)
+        if kind == "ok" and detail != expected:
+            return "mismatch", f"R1 = 0x{detail:x}, expected 0x{expected:x}", log
+        return kind, detail, log
+
+    def check(self, seed, program, expected):
+        kind, detail, log = self.classify(program, expected)
+        if harness.CANCEL.is_set():
+            return None
+        with self.lock:
+            self.stats["run"] += 1
+        if kind == "ok":
+            return None
+
+        if self.do_minimize:
+            program, _ = minimize(program, lambda cand, exp: self.classify(cand, exp)[0] == kind)
+            expected = evaluate(program)
+            _, detail, log = self.classify(program, expected)
+            if harness.CANCEL.is_set():
+                return None
+        source = render(program)
+        key = source_hash(source)
+        with self.lock:
+            self.stats["fail"] += 1
+            if key in self.known_failures:
+                return None
+            self.known_failures.add(key)
+            self.stats["new_fail"] += 1
+        self.failures_dir.mkdir(parents=True, exist_ok=True)
+        header = f"// fuzz seed {seed}: {kind}: {detail}\n// expect: R1 = 0x{expected:x}\n"
+        (self.failures_dir / f"{key}.mln").write_text(header + source)
+        log.path = self.failures_dir / f"{key}.log"
+        log.flush()
+        return key, kind, detail
+
+    def run(self, seeds, deadline=None):
+        """Check every seed not already in the corpus; returns new failures.
+
+        On an interrupt (Ctrl-C) the steps in flight are cancelled; the seeds
+        already checked are still added to the corpus and the scratch work
+        dirs are removed.
+        """
+        harness.CANCEL.clear()
+        found = []
+        pending = {}
+        seed_iter = iter(seeds)
+        executor = ThreadPoolExecutor(max_workers=self.jobs)
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < self.jobs * 2:
+                    if deadline and time.monotonic() >= deadline:
+                        exhausted = True
+                        break
+                    seed = next(seed_iter, None)
+                    if seed is None:
+                        exhausted = True
+                        break
+                    program, expected = generate(seed, **self.gen_args)
+                    key = source_hash(render(program))
+                    if key in self.seen:
+                        self.stats["dup"] += 1
+                        continue
+                    self.seen.add(key)
+                    pending[executor.submit(self.check, seed, program, expected)] = key
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self.new_seen.append(pending.pop(future))
+                    result = future.result()
+                    if result:
+                        key, kind, detail = result
+                        status_line("FAIL", f"{kind} {detail} -> {self.failures_dir / (key + '.mln')}", RED)
+                        found.append(result)
+        except BaseException:
+            harness.cancel_running()
+            raise
+        finally:
+            for future in pending:
+                future.cancel()
+            self.save_corpus()
+            try:
+                executor.shutdown(wait=True)
+            finally:
+                for d in self.work_dirs:
+                    shutil.rmtree(d, ignore_errors=True)
+        return found
+
+    def save_corpus(self):
+        if not self.new_seen:
+            return
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.corpus_path, "a") as f:
+            f.write("\n".join(self.new_seen) + "\n")
+        self.new_seen = []
+
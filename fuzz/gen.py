@@ -0,0 +1,122 @@
+"""
+Random generator of well-typed fuzzer programs (see program.py for the AST).
+
+Every program is checked against the reference evaluator before it is
+returned, so division by zero and out-of-range shifts never reach the
+toolchain.
+"""
+
+import random
+
+from fuzz.program import EvalError, evaluate
+
+ARITH_OPS = ["+", "-", "*"]
+BIT_OPS = ["&", "|", "^"]
+CMP_OPS = ["<", ">", "<=", ">=", "==", "!="]
+LOGIC_OPS = ["&&", "||"]
+
+
+class Generator:
+    def __init__(self, rng: random.Random, max_depth=3, max_stmts=8, max_loop=6):
+        self.rng = rng
+        self.max_depth = max_depth
+        self.max_stmts = max_stmts
+        self.max_loop = max_loop
+        self.counter = 0
+
+    def fresh(self, prefix):
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def literal(self):
+        r = self.rng.random()
+        if r < 0.6:
+            return ("num", self.rng.randint(0, 20))
+        if r < 0.85:
+            return ("num", self.rng.randint(-20, 300))
+        return ("num", self.rng.randint(-100000, 100000))
+
+    def expr(self, scope, depth=0):
+        rng = self.rng
+        if depth >= self.max_depth or rng.random() < 0.25:
+            if scope and rng.random() < 0.6:
+                return ("var", rng.choice(scope))
+            return self.literal()
+        r = rng.random()
+        if r < 0.30:
+            return ("bin", rng.choice(ARITH_OPS), self.expr(scope, depth + 1), self.expr(scope, depth + 1))
+        if r < 0.42:
+            return ("bin", rng.choice(BIT_OPS), self.expr(scope, depth + 1), self.expr(scope, depth + 1))
+        if r < 0.50:
+            # shifts by small constants; right shifts only of masked (non-negative) values
+            op = rng.choice(["<<", ">>"])
+            lhs = self.expr(scope, depth + 1)
+            if op == ">>":
+                lhs = ("bin", "&", lhs, ("num", 0xFFFF))
+            return ("bin", op, lhs, ("num", rng.randint(0, 7)))
+        if r < 0.56:
+            return ("bin", rng.choice(["/", "%"]), self.expr(scope, depth + 1), ("num", rng.randint(1, 9)))
+        if r < 0.68:
+            return ("bin", rng.choice(CMP_OPS), self.expr(scope, depth + 1), self.expr(scope, depth + 1))
+        if r < 0.74:
+            return ("bin", rng.choice(LOGIC_OPS), self.expr(scope, depth + 1), self.expr(scope, depth + 1))
+        if r < 0.80:
+            return ("un", rng.choice(["-", "!"]), self.expr(scope, depth + 1))
+        if r < 0.90:
+            return ("tern", self.expr(scope, depth + 1), self.expr(scope, depth + 1), self.expr(scope, depth + 1))
+        keys = sorted(rng.sample(range(0, 6), rng.randint(1, 3)))
+        return (
+            "case",
+            ("bin", "%", self.expr(scope, depth + 1), ("num", 6)),
+            [(k, self.expr(scope, depth + 1)) for k in keys],
+            self.expr(scope, depth + 1),
+        )
+
+    def body(self, scope, targets, depth):
+        """Loop/if body: assignments to existing variables, maybe nested control flow."""
+        stmts = []
+        for _ in range(self.rng.randint(1, 3)):
+            r = self.rng.random()
+            if depth < 2 and r < 0.2:
+                stmts.append(("if", self.expr(scope, 1), self.body(scope, targets, depth + 1),
+                              self.body(scope, targets, depth + 1) if self.rng.random() < 0.5 else []))
+            elif depth < 1 and r < 0.3:
+                stmts.append(self.loop(scope, targets, depth + 1))
+            else:
+                stmts.append(("assign", self.rng.choice(targets), self.expr(scope, 1)))
+        return stmts
+
+    def loop(self, scope, targets, depth):
+        kind = self.rng.choice(["for", "while", "dowhile"])
+        ivar = self.fresh("i")
+        count = self.rng.randint(0, self.max_loop)
+        return (kind, ivar, count, self.body(scope + [ivar], targets, depth))
+
+    def program(self):
+        scope = []
+        stmts = []
+        for _ in range(self.rng.randint(1, self.max_stmts)):
+            r = self.rng.random()
+            if not scope or r < 0.45:
+                name = self.fresh("v")
+                stmts.append(("decl", name, self.expr(scope)))
+                scope.append(name)
+            elif r < 0.65:
+                stmts.append(("assign", self.rng.choice(scope), self.expr(scope)))
+            elif r < 0.8:
+                stmts.append(("if", self.expr(scope), self.body(scope, scope, 1),
+                              self.body(scope, scope, 1) if self.rng.random() < 0.5 else []))
+            else:
+                stmts.append(self.loop(scope, list(scope), 0))
+        return (stmts, self.expr(scope))
+
+
+def generate(seed, **kwargs):
+    """Return (program, expected R1) for a seed, retrying until the program is valid."""
+    rng = random.Random(seed)
+    while True:
+        program = Generator(rng, **kwargs).program()
+        try:
+            return program, evaluate(program)
+        except EvalError:
+            continue
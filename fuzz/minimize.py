@@ -0,0 +1,118 @@
+"""
+Greedy AST minimization of failing fuzzer programs.
+
+Candidates remove statements, shorten loops, inline branches and replace
+expressions by their operands or small constants. They keep the generator's
+invariants (the left operand of >> stays masked non-negative), so a program
+cannot shrink into a different failure the generator never produces. A
+candidate is kept when it is still valid for the reference evaluator and
+`still_fails(program, expected)` reports the same failure.
+"""
+
+from fuzz.program import EvalError, evaluate, render
+
+
+def non_negative(e):
+    """True for a non-negative constant or a value masked by one (gen.py's >> operands)."""
+    if e[0] == "num":
+        return e[1] >= 0
+    return e[0] == "bin" and e[1] == "&" and e[3][0] == "num" and e[3][1] >= 0
+
+
+def expr_candidates(e):
+    """Smaller replacements for expression e, smallest first."""
+    kind = e[0]
+    out = []
+    if kind != "num" or e[1] not in (0, 1):
+        out += [("num", 0), ("num", 1)]
+    if kind == "num" and abs(e[1]) > 1:
+        out.append(("num", e[1] // 2))
+    if kind == "un":
+        out.append(e[2])
+        out += [("un", e[1], c) for c in expr_candidates(e[2])]
+    elif kind == "bin":
+        out += [e[2], e[3]]
+        lhs = expr_candidates(e[2])
+        if e[1] == ">>":
+            lhs = [c for c in lhs if non_negative(c)]
+        out += [("bin", e[1], c, e[3]) for c in lhs]
+        out += [("bin", e[1], e[2], c) for c in expr_candidates(e[3])]
+    elif kind == "tern":
+        out += [e[2], e[3]]
+        out += [("tern", c, e[2], e[3]) for c in expr_candidates(e[1])]
+        out += [("tern", e[1], c, e[3]) for c in expr_candidates(e[2])]
+        out += [("tern", e[1], e[2], c) for c in expr_candidates(e[3])]
+    elif kind == "case":
+        out.append(e[3])
+        out += [v for _, v in e[2]]
+        for i in range(len(e[2])):
+            arms = e[2][:i] + e[2][i + 1:]
+            if arms:
+                out.append(("case", e[1], arms, e[3]))
+    return out
+
+
+def block_candidates(stmts):
+    """Smaller versions of a statement list."""
+    for i in range(len(stmts)):
+        yield stmts[:i] + stmts[i + 1:]
+    for i, s in enumerate(stmts):
+        for r in stmt_candidates(s):
+            yield stmts[:i] + r + stmts[i + 1:]
+
+
+def stmt_candidates(s):
+    """Replacements (lists of statements) for one statement."""
+    kind = s[0]
+    if kind in ("decl", "assign"):
+        for c in expr_candidates(s[2]):
+            yield [(kind, s[1], c)]
+    elif kind == "if":
+        yield list(s[2])
+        yield list(s[3])
+        for c in expr_candidates(s[1]):
+            yield [("if", c, s[2], s[3])]
+        for b in block_candidates(s[2]):
+            yield [("if", s[1], b, s[3])]
+        for b in block_candidates(s[3]):
+            yield [("if", s[1], s[2], b)]
+    elif kind in ("for", "while", "dowhile"):
+        if s[2] > 1:
+            yield [(kind, s[1], 1, s[3])]
+            yield [(kind, s[1], s[2] - 1, s[3])]
+        if kind != "for":
+            yield [("for", s[1], s[2] if kind == "while" else max(s[2], 1), s[3])]
+        for b in block_candidates(s[3]):
+            yield [(kind, s[1], s[2], b)]
+
+
+def program_candidates(program):
+    stmts, ret = program
+    for b in block_candidates(stmts):
+        yield (b, ret)
+    for c in expr_candidates(ret):
+        yield (stmts, c)
+
+
+def minimize(program, still_fails, max_attempts=300):
+    """Return the smallest program found that still fails, and the attempts used."""
+    attempts = 0
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        size = len(render(program))
+        for cand in program_candidates(program):
+            if len(render(cand)) >= size:
+                continue
+            try:
+                expected = evaluate(cand)
+            except (EvalError, RecursionError):
+                continue
+            attempts += 1
+            if still_fails(cand, expected):
+                program = cand
+                improved = True
+                break
+            if attempts >= max_attempts:
+                break
+    return program, attempts
@@ -0,0 +1,182 @@
+"""
+Fuzzer program representation: tuple ASTs, .mln rendering and the Python
+reference evaluator (i32 two's-complement semantics).
+
+Expressions:
+    ("num", n)  ("var", name)  ("un", op, e)  ("bin", op, a, b)
+    ("tern", cond, a, b)  ("case", e, [(key, value), ...], default)
+Statements:
+    ("decl", name, e)  ("assign", name, e)  ("if", cond, then, else)
+    ("for", ivar, count, body)  ("while", ivar, count, body)
+    ("dowhile", ivar, count, body)
+A program is (statements, return_expression), rendered as `i32 main()`.
+"""
+
+MASK32 = 0xFFFFFFFF
+
+
+def wrap(v):
+    """Wrap a Python int to signed 32-bit."""
+    v &= MASK32
+    return v - (1 << 32) if v & 0x80000000 else v
+
+
+def c_div(a, b):
+    q = abs(a) // abs(b)
+    return q if (a >= 0) == (b >= 0) else -q
+
+
+BINOPS = {
+    "+": lambda a, b: wrap(a + b),
+    "-": lambda a, b: wrap(a - b),
+    "*": lambda a, b: wrap(a * b),
+    "/": lambda a, b: wrap(c_div(a, b)),
+    "%": lambda a, b: wrap(a - b * c_div(a, b)),
+    "&": lambda a, b: wrap(a & b),
+    "|": lambda a, b: wrap(a | b),
+    "^": lambda a, b: wrap(a ^ b),
+    "<<": lambda a, b: wrap(a << b),
+    ">>": lambda a, b: wrap(a >> b),
+    "<": lambda a, b: int(a < b),
+    ">": lambda a, b: int(a > b),
+    "<=": lambda a, b: int(a <= b),
+    ">=": lambda a, b: int(a >= b),
+    "==": lambda a, b: int(a == b),
+    "!=": lambda a, b: int(a != b),
+}
+
+UNOPS = {
+    "-": lambda a: wrap(-a),
+    "!": lambda a: int(a == 0),
+}
+
+
+class EvalError(Exception):
+    """The program is not valid for the reference semantics (e.g. unbound name)."""
+
+
+def eval_expr(e, env):
+    kind = e[0]
+    if kind == "num":
+        return e[1]
+    if kind == "var":
+        if e[1] not in env:
+            raise EvalError(f"unbound {e[1]}")
+        return env[e[1]]
+    if kind == "un":
+        return UNOPS[e[1]](eval_expr(e[2], env))
+    if kind == "bin":
+        op = e[1]
+        a = eval_expr(e[2], env)
+        if op == "&&":
+            return int(bool(a) and bool(eval_expr(e[3], env)))
+        if op == "||":
+            return int(bool(a) or bool(eval_expr(e[3], env)))
+        b = eval_expr(e[3], env)
+        if op in ("/", "%") and b == 0:
+            raise EvalError("division by zero")
+        if op in ("<<", ">>") and not 0 <= b < 32:
+            raise EvalError("shift out of range")
+        return BINOPS[op](a, b)
+    if kind == "tern":
+        return eval_expr(e[2], env) if eval_expr(e[1], env) else eval_expr(e[3], env)
+    if kind == "case":
+        v = eval_expr(e[1], env)
+        for key, val in e[2]:
+            if v == key:
+                return eval_expr(val, env)
+        return eval_expr(e[3], env)
+    raise EvalError(f"unknown expression {kind}")
+
+
+def exec_block(stmts, env):
+    for s in stmts:
+        kind = s[0]
+        if kind == "decl":
+            if s[1] in env:
+                raise EvalError(f"redeclared {s[1]}")
+            env[s[1]] = eval_expr(s[2], env)
+        elif kind == "assign":
+            if s[1] not in env:
+                raise EvalError(f"unbound {s[1]}")
+            env[s[1]] = eval_expr(s[2], env)
+        elif kind == "if":
+            exec_block(s[2] if eval_expr(s[1], env) else s[3], env)
+        elif kind in ("for", "while", "dowhile"):
+            if s[1] in env:
+                raise EvalError(f"redeclared {s[1]}")
+            for i in range(max(s[2], 1 if kind == "dowhile" else 0)):
+                env[s[1]] = i
+                exec_block(s[3], env)
+            env.pop(s[1], None)
+        else:
+            raise EvalError(f"unknown statement {kind}")
+
+
+def evaluate(program):
+    """Return main()'s return value as the emulator would report R1 (unsigned 32-bit)."""
+    stmts, ret = program
+    env = {}
+    exec_block(stmts, env)
+    return eval_expr(ret, env) & MASK32
+
+
+def render_expr(e):
+    kind = e[0]
+    if kind == "num":
+        return f"({e[1]})" if e[1] < 0 else str(e[1])
+    if kind == "var":
+        return e[1]
+    if kind == "un":
+        return f"({e[1]}{render_expr(e[2])})"
+    if kind == "bin":
+        return f"({render_expr(e[2])} {e[1]} {render_expr(e[3])})"
+    if kind == "tern":
+        return f"({render_expr(e[1])} ? {render_expr(e[2])} : {render_expr(e[3])})"
+    if kind == "case":
+        arms = " ".join(f"{k} -> {render_expr(v)};" for k, v in e[2])
+        return f"(case {render_expr(e[1])} of {{ {arms} _ -> {render_expr(e[3])}; }})"
+    raise ValueError(kind)
+
+
+def render_block(stmts, indent):
+    pad = "    " * indent
+    lines = []
+    for s in stmts:
+        kind = s[0]
+        if kind == "decl":
+            lines.append(f"{pad}i32 {s[1]} = {render_expr(s[2])};")
+        elif kind == "assign":
+            lines.append(f"{pad}{s[1]} = {render_expr(s[2])};")
+        elif kind == "if":
+            lines.append(f"{pad}if ({render_expr(s[1])}) {{")
+            lines += render_block(s[2], indent + 1)
+            if s[3]:
+                lines.append(f"{pad}}} else {{")
+                lines += render_block(s[3], indent + 1)
+            lines.append(f"{pad}}}")
+        elif kind == "for":
+            lines.append(f"{pad}for (i32 {s[1]} = 0; {s[1]} < {s[2]}; {s[1]}++) {{")
+            lines += render_block(s[3], indent + 1)
+            lines.append(f"{pad}}}")
+        elif kind == "while":
+            lines.append(f"{pad}i32 {s[1]} = 0;")
+            lines.append(f"{pad}while ({s[1]} < {s[2]}) {{")
+            lines += render_block(s[3], indent + 1)
+            lines.append(f"{pad}    {s[1]}++;")
+            lines.append(f"{pad}}}")
+        elif kind == "dowhile":
+            lines.append(f"{pad}i32 {s[1]} = 0;")
+            lines.append(f"{pad}do {{")
+            lines += render_block(s[3], indent + 1)
+            lines.append(f"{pad}    {s[1]}++;")
+            lines.append(f"{pad}}} while ({s[1]} < {s[2]});")
+        else:
+            raise ValueError(kind)
+    return lines
+
+
+def render(program):
+    stmts, ret = program
+    body = render_block(stmts, 1)
+    return "i32 main() {\n" + "\n".join(body + [f"    return {render_expr(ret)};"]) + "\n}\n"
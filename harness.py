@@ -0,0 +1,262 @@
+"""
+Shared helpers for the MyTester suites: colored status output, subprocess
+steps with per-case logs, per-case artifact directories and the PASS/FAIL
+report.
+"""
+
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+
+import events
+
+VERBOSE = False
+
+# "disk": intermediates are written straight into outputs/.
+# "tmpfs": intermediates live in a RAM-backed scratch dir and only failing
+# cases are promoted to outputs/.
+ARTIFACT_MODES = ("disk", "tmpfs")
+ARTIFACT_MODE = "disk"
+
+# Set by the runner to abort the run; cancellable steps in flight are killed.
+CANCEL = threading.Event()
+_running = set()
+_running_lock = threading.Lock()
+# Serializes console output from worker threads.
+_print_lock = threading.RLock()
+
+GREEN = "32"     # Success
+RED = "31"       # Error
+YELLOW = "33"    # Warning
+CYAN = "36"
+BOLD = "1"
+
+
+def colored(text, color_code):
+    return f"\033[{color_code}m{text}\033[0m"
+
+
+def status_line(label, message, color=CYAN):
+    with _print_lock:
+        print(colored(f"[{label}]", color), message, flush=True)
+
+
+def fmt_hex(v: int) -> str:
+    """Format integer as 0x-prefixed lowercase hex (no leading zeros)."""
+    return f"0x{v:x}"
+
+
+def has_failure(outcomes):
+    """Return True if any outcome marks a failure."""
+    return any(msg.startswith("❌") for msg in outcomes)
+
+
+def was_cancelled(outcomes):
+    """Return True if a step was skipped or killed by cancel_running()."""
+    return any(msg.startswith("⏹") for msg in outcomes)
+
+
+def cancel_running():
+    """Set CANCEL and kill every cancellable subprocess currently running."""
+    with _running_lock:
+        CANCEL.set()
+        for proc in _running:
+            _kill_group(proc)
+
+
+def _kill_group(proc):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+def scratch_root():
+    """RAM-backed directory for tmpfs artifacts (falls back to the temp dir)."""
+    shm = Path("/dev/shm")
+    return shm if shm.is_dir() else Path(tempfile.gettempdir())
+
+
+class StepLog:
+    """Log text buffered in memory and appended to `path` in a single write."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._chunks = []
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        with self._lock:
+            self._chunks.append(text)
+
+    def flush(self):
+        with self._lock:
+            text = "".join(self._chunks)
+            self._chunks = []
+        if text:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as log_file:
+                log_file.write(text)
+
+    def discard(self):
+        with self._lock:
+            self._chunks = []
+
+
+class CaseArtifacts:
+    """Working directory and buffered log for one test case.
+
+    In "disk" mode `dir` is the final output directory. In "tmpfs" mode it is
+    a private scratch directory; finish() promotes its contents and the log to
+    `final_dir` only when the case failed, and always removes the scratch.
+    When a case passes in tmpfs mode, output left by an earlier failure is
+    removed: the whole `final_dir` if the case owns it (`own_dir`), otherwise
+    just its log.
+    """
+
+    def __init__(self, name, final_dir, log_name=None, own_dir=False):
+        self.final_dir = Path(final_dir)
+        self.own_dir = own_dir
+        self.log = StepLog(self.final_dir / f"{log_name or name}.log")
+        self.scratch = ARTIFACT_MODE == "tmpfs"
+        if self.scratch:
+            self.dir = Path(tempfile.mkdtemp(prefix=f"mytester-{name}-", dir=scratch_root()))
+        else:
+            self.dir = self.final_dir
+            self.dir.mkdir(parents=True, exist_ok=True)
+
+    def finish(self, outcomes):
+        failed = has_failure(outcomes) and not was_cancelled(outcomes)
+        if self.scratch:
+            if failed:
+                shutil.copytree(self.dir, self.final_dir, dirs_exist_ok=True)
+            shutil.rmtree(self.dir, ignore_errors=True)
+            if not failed:
+                self.log.discard()
+                if not was_cancelled(outcomes):
+                    if self.own_dir:
+                        shutil.rmtree(self.final_dir, ignore_errors=True)
+                    else:
+                        self.log.path.unlink(missing_ok=True)
+        self.log.flush()
+
+
+def run_step(command, description, log, outcomes, timeout=None, cwd=None, env=None, pass_fds=(),
+             cancellable=True):
+    """Run a subprocess, record its output in `log` (a StepLog) and return stripped stdout.
+
+    On failure a "❌" outcome (plus the log location) is appended to outcomes
+    and None is returned. Cancellable steps are skipped once CANCEL is set and
+    killed by cancel_running(); they then record a "⏹" outcome instead.
+    """
+    command = [str(c) for c in command]
+    header = f"\n--- {description} ---\nCommand: {' '.join(command)}\n"
+    if cancellable and CANCEL.is_set():
+        outcomes.append(f"⏹ {description} cancelled")
+        return None
+    step = events.step_start(command, description)
+    try:
+        if VERBOSE:
+            status_line("RUN", description, CYAN)
+
+        proc = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd,
+            env=env, pass_fds=pass_fds, start_new_session=cancellable
+        )
+        if cancellable:
+            with _running_lock:
+                _running.add(proc)
+                if CANCEL.is_set():
+                    _kill_group(proc)
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            stdout, stderr = proc.communicate()
+            step["status"] = "timeout"
+            log.write(
+                f"{header}\n[TIMEOUT] {description}\n"
+                f"Partial STDOUT:\n{stdout}\nPartial STDERR:\n{stderr}\n"
+            )
+            outcomes.append(f"❌ {description} timed out ({timeout}s)")
+            outcomes.append(f"   log: {log.path}")
+            return None
+        finally:
+            if cancellable:
+                with _running_lock:
+                    _running.discard(proc)
+
+        step["exit_code"] = proc.returncode
+        if proc.returncode != 0:
+            if cancellable and CANCEL.is_set():
+                step["status"] = "cancelled"
+                log.write(f"{header}\n[CANCELLED] {description}\n")
+                outcomes.append(f"⏹ {description} cancelled")
+                return None
+            step["status"] = "failed"
+            log.write(
+                f"{header}\n[FAILED] {description}\nReturn Code: {proc.returncode}\n"
+                f"STDOUT:\n{stdout}\nSTDERR:\n{stderr}\n"
+            )
+            outcomes.append(f"❌ {description}")
+            outcomes.append(f"   log: {log.path}")
+            return None
+
+        step["status"] = "ok"
+        log.write(f"{header}STDOUT:\n{stdout}\nSTDERR:\n{stderr}\n")
+        if VERBOSE:
+            status_line("OK", description, GREEN)
+        return stdout.strip()
+
+    except Exception as e:
+        log.write(f"{header}\n[ERROR] {e}\n")
+        outcomes.append(f"❌ {description} error: {e}")
+        return None
+    finally:
+        events.step_finish(step)
+
+
+def print_failure(name, outcomes):
+    summary = next((outcome for outcome in outcomes if outcome.startswith("❌")), "❌ failed")
+    with _print_lock:
+        status_line("FAIL", f"{name} {summary.removeprefix('❌ ').strip()}", RED)
+        if VERBOSE:
+            return
+        for outcome in outcomes:
+            if outcome.startswith("✅"):
+                continue
+            print(f"  {outcome}")
+
+
+def report(results, cancelled=(), shown=()):
+    """Print PASS/FAIL lines for {name: outcomes} and return the failed names.
+
+    Failures in `shown` were already printed (failfast) and are only counted.
+    """
+    passed = 0
+    failures = []
+
+    for name in sorted(results.keys()):
+        if has_failure(results[name]):
+            failures.append((name, results[name]))
+        else:
+            passed += 1
+            success_msg = next((outcome for outcome in results[name] if outcome.startswith("✅")), "✅ PASS")
+            detail = success_msg.removeprefix("✅ ").strip()
+            status_line("PASS", f"{name} {detail}", GREEN)
+
+    for name, outcomes in failures:
+        if name not in shown:
+            print_failure(name, outcomes)
+
+    summary = f"Summary: {passed} passed, {len(failures)} failed"
+    if cancelled:
+        summary += f", {len(cancelled)} cancelled"
+    status_line("DONE", summary, GREEN if not failures else YELLOW)
+    if failures:
+        print("Failed cases:", ", ".join(name for name, _ in failures))
+    return [name for name, _ in failures]
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Link map and footprint report for images linked by mllinker.
+
+Objects are placed as in mobj.link_layout (all text sections in link order,
+then all data sections). A symbol's size runs from its offset to the next
+defined symbol in the same section, or to the section end; bytes before a
+section's first symbol are reported as "(unnamed)". Sizes are bytes;
+addresses are emulator addresses of --addr-unit bytes (mobj.ADDR_UNIT).
+
+A budget file (JSON) caps sizes in bytes and fails the check when exceeded:
+
+    {"image": 65536, "total": 60000, "text": 49152, "data": 16384,
+     "objects": {"kernel_main.mobj": 40000, "*": 8192},
+     "symbols": {"kernel_main": 4096, "__*": 512}}
+
+Object and symbol keys are fnmatch patterns (objects match their file name or
+full path); values may also be strings like "0x1000", "48K" or "1.5M".
+load_budget() validates every limit up front and raises ValueError for a bad
+budget.
+"""
+
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+
+from mobj import ADDR_UNIT, ADDR_UNITS, link_layout
+
+
+def build_map(paths, text_base=0, data_base=None, unit=ADDR_UNIT):
+    """Return {objects, symbols, text_size, data_size, total} for the objects in link order."""
+    objects = []
+    symbols = []
+    for entry in link_layout(paths, text_base, data_base, unit):
+        path = entry["path"]
+        for section, key in (("TEXT", "text"), ("DATA", "data")):
+            size = entry[f"{key}_size"]
+            base = entry[f"{key}_addr"]
+            syms = sorted((s for s in entry["symbols"] if s["section"] == section), key=lambda s: s["offset"])
+            starts = [s["offset"] for s in syms]
+            if size and (not starts or starts[0] > 0):
+                symbols.append({"name": "(unnamed)", "object": path.name, "section": section,
+                                "address": base, "size": starts[0] if starts else size})
+            for i, sym in enumerate(syms):
+                end = starts[i + 1] if i + 1 < len(syms) else max(size, sym["offset"])
+                symbols.append({"name": sym["name"], "object": path.name, "section": section,
+                                "address": sym["address"], "size": end - sym["offset"]})
+        objects.append({
+            "path": str(path),
+            "name": path.name,
+            "text_addr": entry["text_addr"],
+            "text_size": entry["text_size"],
+            "data_addr": entry["data_addr"],
+            "data_size": entry["data_size"],
+            "total": entry["text_size"] + entry["data_size"],
+        })
+    text_size = sum(o["text_size"] for o in objects)
+    data_size = sum(o["data_size"] for o in objects)
+    return {
+        "objects": sorted(objects, key=lambda o: (-o["total"], o["name"])),
+        "symbols": sorted(symbols, key=lambda s: (-s["size"], s["name"])),
+        "text_size": text_size,
+        "data_size": data_size,
+        "total": text_size + data_size,
+    }
+
+
+def format_map(link_map, image=None, top=None):
+    """Human-readable link map, largest objects and symbols first."""
+    lines = [
+        f"Total: {link_map['total']} bytes (text {link_map['text_size']}, data {link_map['data_size']})",
+    ]
+    if image is not None:
+        lines.append(f"Image: {image} ({Path(image).stat().st_size} bytes)")
+    total = link_map["total"] or 1
+    lines += ["", "Objects (by footprint):",
+              f"  {'total':>8} {'%':>6} {'text':>8} {'data':>8}  {'text@':>10} {'data@':>10}  object"]
+    for o in link_map["objects"]:
+        lines.append(
+            f"  {o['total']:>8} {100 * o['total'] / total:>5.1f}% {o['text_size']:>8} {o['data_size']:>8}"
+            f"  0x{o['text_addr']:08x} 0x{o['data_addr']:08x}  {o['path']}"
+        )
+    syms = link_map["symbols"][:top] if top else link_map["symbols"]
+    lines += ["", f"Symbols (by size{f', top {top}' if top else ''}):",
+              f"  {'size':>8} {'address':>10} {'sect':<4}  symbol (object)"]
+    for s in syms:
+        lines.append(f"  {s['size']:>8} 0x{s['address']:08x} {s['section']:<4}  {s['name']} ({s['object']})")
+    return "\n".join(lines) + "\n"
+
+
+SIZE_SCALES = {"K": 1024, "M": 1024 * 1024}
+
+
+def parse_size(value):
+    """Bytes for an int, "0x1000", "48K" or "1.5M" (fractions round down)."""
+    if isinstance(value, bool):
+        raise ValueError(f"bad size {value!r}")
+    if isinstance(value, int):
+        size = value
+    elif isinstance(value, (float, str)):
+        text = str(value).strip().upper()
+        scale = SIZE_SCALES.get(text[-1:], 1)
+        if scale != 1:
+            text = text[:-1]
+        try:
+            size = int(text, 0) * scale
+        except ValueError:
+            try:
+                size = int(float(text) * scale)
+            except (OverflowError, ValueError):
+                raise ValueError(f"bad size {value!r}") from None
+    else:
+        raise ValueError(f"bad size {value!r}")
+    if size < 0:
+        raise ValueError(f"bad size {value!r}: negative")
+    return size
+
+
+def load_budget(path):
+    """Read and validate a budget file; every limit is converted to bytes."""
+    try:
+        raw = json.loads(Path(path).read_text())
+    except ValueError as e:
+        raise ValueError(f"bad budget {path}: {e}") from None
+    if not isinstance(raw, dict):
+        raise ValueError(f"bad budget {path}: must be a JSON object")
+    budget = {}
+    try:
+        for key, value in raw.items():
+            if key in ("image", "total", "text", "data"):
+                budget[key] = parse_size(value)
+            elif key in ("objects", "symbols"):
+                if not isinstance(value, dict):
+                    raise ValueError(f"\"{key}\" must map patterns to sizes")
+                budget[key] = {pattern: parse_size(limit) for pattern, limit in value.items()}
+            else:
+                raise ValueError(f"unknown key \"{key}\"")
+    except ValueError as e:
+        raise ValueError(f"bad budget {path}: {e}") from None
+    return budget
+
+
+def check_budget(link_map, budget, image=None):
+    """Return a list of "what: size > limit" violations (empty when within budget).
+
+    `budget` is the validated form returned by load_budget().
+    """
+    violations = []
+
+    def check(what, size, limit):
+        if size > limit:
+            violations.append(f"{what}: {size} > {limit} bytes (+{size - limit})")
+
+    for key in ("total", "text", "data"):
+        if key in budget:
+            check(key, link_map["total" if key == "total" else f"{key}_size"], budget[key])
+    if "image" in budget and image is not None:
+        check(f"image {Path(image).name}", Path(image).stat().st_size, budget["image"])
+    for pattern, limit in budget.get("objects", {}).items():
+        for o in link_map["objects"]:
+            if fnmatch.fnmatchcase(o["name"], pattern) or fnmatch.fnmatchcase(o["path"], pattern):
+                check(f"object {o['name']}", o["total"], limit)
+    for pattern, limit in budget.get("symbols", {}).items():
+        for s in link_map["symbols"]:
+            if fnmatch.fnmatchcase(s["name"], pattern):
+                check(f"symbol {s['name']} ({s['object']})", s["size"], limit)
+    return violations
+
+
+def write_map(link_map, path, image=None):
+    """Write the map as JSON when `path` ends in .json, otherwise as text."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix == ".json":
+        path.write_text(json.dumps(link_map, indent=2))
+    else:
+        path.write_text(format_map(link_map, image))
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Link map and size budget check for linked .mobj files")
+    parser.add_argument("objs", nargs="+", help=".mobj files in link order")
+    parser.add_argument("--image", help="Linked .mbin, for its file size and the budget's \"image\" limit")
+    parser.add_argument("-o", "--out", help="Write the map here (.json for JSON) instead of printing it")
+    parser.add_argument("--top", type=int, help="Print only the N largest symbols")
+    parser.add_argument("--budget", help="JSON size budget; exit 1 when exceeded")
+    parser.add_argument("--text-base", type=lambda v: int(v, 0), default=0, help="Load address of the first text section")
+    parser.add_argument("--data-base", type=lambda v: int(v, 0), help="Address of the first data section (default: after text)")
+    parser.add_argument("--addr-unit", type=int, choices=ADDR_UNITS, default=ADDR_UNIT,
+                        help="Bytes per emulator address (default: %(default)s, MYEMU_ADDR_UNIT)")
+    args = parser.parse_args(argv)
+
+    try:
+        budget = load_budget(args.budget) if args.budget else None
+        link_map = build_map(args.objs, args.text_base, args.data_base, args.addr_unit)
+    except (OSError, ValueError) as e:
+        print(f"[ERROR] {e}")
+        return 2
+    if args.out:
+        write_map(link_map, args.out, args.image)
+        print(f"Link map: {args.out}")
+    else:
+        print(format_map(link_map, args.image, args.top), end="")
+
+    if budget is not None:
+        try:
+            violations = check_budget(link_map, budget, args.image)
+        except OSError as e:
+            print(f"[ERROR] {e}")
+            return 2
+        for v in violations:
+            print(f"[BUDGET] {v}")
+        if violations:
+            return 1
+        print(f"[BUDGET] within {args.budget}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Compact sparse snapshots of myemu's memory_dump.txt.
+
+  convert  memory_dump.txt -> page-indexed binary snapshot (.mdmp)
+  diff     two snapshots (text dumps are converted on the fly); only changed
+           pages are compared word by word
+  show     symbolized view of the data symbols of the linked objects
+
+.mdmp layout (little-endian): header, sorted u32 page numbers, then the raw
+bytes of each non-zero page in the same order. Zero pages are omitted, and
+the file is memory-mapped for reading.
+
+Addresses are emulator addresses of --addr-unit bytes each (mobj.ADDR_UNIT,
+word-addressed by default); pages, sizes and widths are in bytes. The unit is
+recorded in the snapshot header.
+"""
+
+import argparse
+import bisect
+import mmap
+import re
+import struct
+import sys
+from pathlib import Path
+
+from mobj import ADDR_UNIT, ADDR_UNITS, link_layout
+
+SNAP_MAGIC = b"MDMP"
+SNAP_VERSION = 2
+SNAP_HEADER = struct.Struct("<4sLLLLQ")  # magic, version, page_size, addr_unit, page_count, mem_size
+DEFAULT_PAGE_SIZE = 4096
+WORD = 4
+
+_ADDR_RE = re.compile(r"^\s*(?:0x)?([0-9A-Fa-f]+)\s*:\s*(.*)$")
+_HEX_RE = re.compile(r"^(?:0x)?([0-9A-Fa-f]+)$")
+
+
+def parse_text_dump(path, page_size=DEFAULT_PAGE_SIZE, unit=ADDR_UNIT):
+    """Parse a text dump into ({page_number: bytearray}, mem_size).
+
+    Lines look like "<addr>: <v> <v> ..." (addr optional: lines without one
+    continue at the previous end). Each value is stored little-endian in
+    len/2 bytes rounded up to whole addresses of `unit` bytes, so with unit 1
+    two hex digits are one byte and with unit 4 every value is one word.
+    Pages are indexed by byte offset (address * unit). Only pages that are written
+    are allocated, so a dump touching the top of the address space stays
+    small; mem_size is one past the highest byte written. Blank lines and "#"
+    comments are skipped; any other line that does not parse, or a dump with
+    no values at all, raises ValueError rather than yielding a wrong snapshot.
+    """
+    pages = {}
+    mem_size = 0
+    addr = 0
+    found = False
+    with open(path, "r", errors="replace") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip() or line.lstrip().startswith("#"):
+                continue
+            m = _ADDR_RE.match(line)
+            if m:
+                addr = int(m.group(1), 16) * unit
+                rest = m.group(2)
+            else:
+                rest = line
+            chunk = bytearray()
+            for tok in rest.split():
+                hm = _HEX_RE.match(tok)
+                if not hm:
+                    raise ValueError(f"{path}:{lineno}: unrecognized dump line: {line.strip()[:80]!r}")
+                digits = hm.group(1)
+                width = -(-max(1, (len(digits) + 1) // 2) // unit) * unit
+                chunk += int(digits, 16).to_bytes(width, "little")
+            if not chunk:
+                continue
+            found = True
+            _store(pages, page_size, addr, chunk)
+            addr += len(chunk)
+            mem_size = max(mem_size, addr)
+    if not found:
+        raise ValueError(f"{path}: no memory values found")
+    return pages, mem_size
+
+
+def _store(pages, page_size, addr, data):
+    """Copy data to addr in a {page_number: bytearray} map, allocating pages as needed."""
+    view = memoryview(data)
+    while view:
+        number, off = divmod(addr, page_size)
+        take = min(len(view), page_size - off)
+        page = pages.get(number)
+        if page is None:
+            page = pages[number] = bytearray(page_size)
+        page[off:off + take] = view[:take]
+        addr += take
+        view = view[take:]
+
+
+def page_index(numbers):
+    return struct.pack(f"<{len(numbers)}I", *numbers)
+
+
+def words(data):
+    """Little-endian 32-bit words of data (len must be a multiple of WORD)."""
+    return struct.unpack(f"<{len(data) // WORD}I", data)
+
+
+def write_snapshot(pages, mem_size, out_path, page_size=DEFAULT_PAGE_SIZE, unit=ADDR_UNIT):
+    """Write the non-zero pages of a parse_text_dump() page map to out_path."""
+    pages = sorted((n, bytes(data)) for n, data in pages.items() if any(data))
+    with open(out_path, "wb") as f:
+        f.write(SNAP_HEADER.pack(SNAP_MAGIC, SNAP_VERSION, page_size, unit, len(pages), mem_size))
+        f.write(page_index([n for n, _ in pages]))
+        for _, data in pages:
+            f.write(data)
+    return len(pages)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of an .mdmp file (or an in-memory text dump).
+
+    `unit` (bytes per address) applies to text dumps; .mdmp files carry their own.
+    """
+
+    def __init__(self, path, unit=ADDR_UNIT):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            magic = f.read(4)
+        if magic != SNAP_MAGIC:
+            self._buf = None
+            self.page_size = DEFAULT_PAGE_SIZE
+            self.unit = unit
+            pages, self.mem_size = parse_text_dump(self.path, self.page_size, unit)
+            self._pages = {n: bytes(data) for n, data in pages.items() if any(data)}
+            self.page_numbers = sorted(self._pages)
+            return
+
+        with open(self.path, "rb") as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        version = struct.unpack_from("<L", self._buf, 4)[0]
+        if version != SNAP_VERSION:
+            raise ValueError(f"{self.path}: unsupported snapshot version {version}")
+        magic, version, self.page_size, self.unit, count, self.mem_size = SNAP_HEADER.unpack_from(self._buf, 0)
+        if self.page_size <= 0 or self.page_size % WORD:
+            raise ValueError(f"{self.path}: bad page size {self.page_size}")
+        if self.unit not in ADDR_UNITS:
+            raise ValueError(f"{self.path}: bad address unit {self.unit}")
+        index_off = SNAP_HEADER.size
+        self.page_numbers = list(struct.unpack_from(f"<{count}I", self._buf, index_off))
+        self._data_off = index_off + 4 * count
+        self._pages = None
+
+    def page(self, number):
+        """Return the bytes of page `number`, or None for an all-zero page."""
+        if self._pages is not None:
+            return self._pages.get(number)
+        i = bisect.bisect_left(self.page_numbers, number)
+        if i == len(self.page_numbers) or self.page_numbers[i] != number:
+            return None
+        start = self._data_off + i * self.page_size
+        return self._buf[start:start + self.page_size]
+
+    def read(self, addr, size):
+        """Return `size` bytes starting at emulator address `addr`."""
+        addr *= self.unit
+        out = bytearray()
+        while size > 0:
+            number, off = divmod(addr, self.page_size)
+            take = min(size, self.page_size - off)
+            page = self.page(number)
+            out += page[off:off + take] if page is not None else bytes(take)
+            addr += take
+            size -= take
+        return bytes(out)
+
+    def word(self, addr):
+        return int.from_bytes(self.read(addr, WORD), "little")
+
+
+def diff_snapshots(a, b):
+    """Yield (addr, old_word, new_word) for every changed 32-bit word."""
+    if a.page_size != b.page_size:
+        raise ValueError(f"snapshots use different page sizes ({a.page_size} and {b.page_size}); "
+                         "convert both with the same --page-size")
+    if a.unit != b.unit:
+        raise ValueError(f"snapshots use different address units ({a.unit} and {b.unit}); "
+                         "convert both with the same --addr-unit")
+    zero = bytes(a.page_size)
+    for number in sorted(set(a.page_numbers) | set(b.page_numbers)):
+        pa = a.page(number)
+        pb = b.page(number)
+        pa = zero if pa is None else pa
+        pb = zero if pb is None else pb
+        if pa == pb:
+            continue
+        wa = words(bytes(pa))
+        wb = words(bytes(pb))
+        base = number * a.page_size
+        for i in range(len(wa)):
+            if wa[i] != wb[i]:
+                yield (base + i * WORD) // a.unit, wa[i], wb[i]
+
+
+def data_symbols(obj_paths, text_base=0, data_base=None, unit=ADDR_UNIT):
+    """Return [(name, addr, size, object)] for DATA symbols in link order (size in bytes)."""
+    out = []
+    for entry in link_layout(obj_paths, text_base, data_base, unit):
+        syms = sorted((s for s in entry["symbols"] if s["section"] == "DATA"), key=lambda s: s["offset"])
+        for i, sym in enumerate(syms):
+            nxt = syms[i + 1]["offset"] if i + 1 < len(syms) else entry["data_size"]
+            out.append((sym["name"], sym["address"], nxt - sym["offset"], entry["path"].name))
+    return out
+
+
+def symbolize(addr, symbols, unit=ADDR_UNIT):
+    for name, start, size, _ in symbols:
+        if start <= addr < start + max(-(-size // unit), 1):
+            return f"{name}+{addr - start:#x}" if addr != start else name
+    return ""
+
+
+def cmd_convert(args):
+    pages, mem_size = parse_text_dump(args.dump, args.page_size, args.addr_unit)
+    out = Path(args.out) if args.out else Path(args.dump).with_suffix(".mdmp")
+    count = write_snapshot(pages, mem_size, out, args.page_size, args.addr_unit)
+    print(f"{out}: {count} non-zero page(s) of {args.page_size} bytes, {mem_size} bytes addressed")
+    return 0
+
+
+def cmd_diff(args):
+    a = Snapshot(args.old, args.addr_unit)
+    b = Snapshot(args.new, args.addr_unit)
+    symbols = data_symbols(args.obj, args.text_base, args.data_base, a.unit) if args.obj else []
+    changed_pages = set()
+    count = 0
+    for addr, old, new in diff_snapshots(a, b):
+        changed_pages.add(addr * a.unit // a.page_size)
+        count += 1
+        if count <= args.limit:
+            label = symbolize(addr, symbols, a.unit)
+            print(f"0x{addr:08x}: 0x{old:08x} -> 0x{new:08x}" + (f"  {label}" if label else ""))
+    if args.limit and count > args.limit:
+        print(f"... ({count - args.limit} more changed words)")
+    print(f"{count} changed word(s) in {len(changed_pages)} page(s)")
+    return 1 if count else 0
+
+
+def cmd_show(args):
+    snap = Snapshot(args.snapshot, args.addr_unit)
+    for name, addr, size, obj in data_symbols(args.obj, args.text_base, args.data_base, snap.unit):
+        raw = snap.read(addr, min(size, args.max_bytes))
+        words = " ".join(f"{int.from_bytes(raw[i:i + WORD], 'little'):08x}" for i in range(0, len(raw), WORD))
+        more = " ..." if size > args.max_bytes else ""
+        print(f"0x{addr:08x} {size:6d} {obj}:{name} = {words}{more}")
+    return 0
+
+
+def limit_arg(value):
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = -1
+    if limit < 0:
+        raise argparse.ArgumentTypeError(f"limit must be an integer >= 0: {value}")
+    return limit
+
+
+def page_size_arg(value):
+    size = int(value, 0)
+    if size <= 0 or size % WORD:
+        raise argparse.ArgumentTypeError(f"page size must be a positive multiple of {WORD}: {value}")
+    return size
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Convert, diff and inspect myemu memory dumps")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("convert", help="Convert memory_dump.txt to a sparse .mdmp snapshot")
+    p.add_argument("dump", help="Text dump (e.g. memory_dump.txt)")
+    p.add_argument("-o", "--out", help="Output path (default: <dump>.mdmp)")
+    p.add_argument("--page-size", type=page_size_arg, default=DEFAULT_PAGE_SIZE,
+                   help="Page size in bytes (a positive multiple of 4)")
+    p.add_argument("--addr-unit", type=int, choices=ADDR_UNITS, default=ADDR_UNIT,
+                   help="Bytes per emulator address (default: %(default)s, MYEMU_ADDR_UNIT)")
+    p.set_defaults(func=cmd_convert)
+
+    for name, func, help_text in (
+        ("diff", cmd_diff, "Show words that differ between two snapshots"),
+        ("show", cmd_show, "Show data symbols of the linked objects"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        if name == "diff":
+            p.add_argument("old", help="Old snapshot (.mdmp or text dump)")
+            p.add_argument("new", help="New snapshot (.mdmp or text dump)")
+            p.add_argument("--limit", type=limit_arg, default=200, help="Max changed words to print (0: summary only)")
+            p.add_argument("--obj", nargs="*", default=[], help=".mobj files in link order, for symbol names")
+        else:
+            p.add_argument("snapshot", help="Snapshot (.mdmp or text dump)")
+            p.add_argument("--obj", nargs="+", required=True, help=".mobj files in link order")
+            p.add_argument("--max-bytes", type=int, default=32, help="Max bytes shown per symbol")
+        p.add_argument("--text-base", type=lambda v: int(v, 0), default=0, help="Load address of the first text section")
+        p.add_argument("--data-base", type=lambda v: int(v, 0), help="Address of the first data section (default: after text)")
+        p.add_argument("--addr-unit", type=int, choices=ADDR_UNITS, default=ADDR_UNIT,
+                       help="Bytes per address of text dumps and objects (.mdmp files record their own)")
+        p.set_defaults(func=func)
+
+    args = parser.parse_args(argv)
+    try:
+        return args.func(args)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""
+LNK1 object file (.mobj) layout shared by the MyTester tools.
+"""
+
+import os
+import struct
+from pathlib import Path
+
+MAGIC = 0x4C4E4B31  # "LNK1"
+HEADER_STRUCT = struct.Struct("<LLLLL")     # magic, text_size, data_size, sym_count, reloc_count
+SYMBOL_STRUCT = struct.Struct("<64sLLL")    # name[64], type, section, offset
+RELOC_STRUCT = struct.Struct("<L64sL")      # offset, symbol_name[64], type
+
+SYMBOL_TYPES = {0: "UNDEFINED", 1: "DEFINED"}
+SECTION_TYPES = {0: "TEXT", 1: "DATA"}
+RELOC_TYPES = {0: "ABSOLUTE", 1: "RELATIVE"}
+
+# Bytes per emulator address. myemu's trace advances the PC by one per 32-bit
+# instruction, so memory is taken to be word-addressed; MYEMU_ADDR_UNIT=1
+# selects byte addressing.
+ADDR_UNITS = (1, 2, 4)
+ADDR_UNIT = int(os.environ.get("MYEMU_ADDR_UNIT", "4"))
+if ADDR_UNIT not in ADDR_UNITS:
+    raise ValueError(f"MYEMU_ADDR_UNIT must be one of {ADDR_UNITS}, got {ADDR_UNIT}")
+
+
+def read_header(f):
+    data = f.read(HEADER_STRUCT.size)
+    if len(data) != HEADER_STRUCT.size:
+        raise ValueError("File too short for header")
+    return HEADER_STRUCT.unpack(data)
+
+
+def read_symbols(f, count):
+    symbols = []
+    for _ in range(count):
+        data = f.read(SYMBOL_STRUCT.size)
+        if len(data) != SYMBOL_STRUCT.size:
+            raise ValueError("File too short while reading symbols")
+        raw_name, type_code, section_code, offset = SYMBOL_STRUCT.unpack(data)
+        name = raw_name.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        symbols.append(
+            {
+                "name": name,
+                "type": SYMBOL_TYPES.get(type_code, f"UNKNOWN({type_code})"),
+                "section": SECTION_TYPES.get(section_code, f"UNKNOWN({section_code})"),
+                "offset": offset,
+            }
+        )
+    return symbols
+
+
+def read_relocs(f, count):
+    relocs = []
+    for _ in range(count):
+        data = f.read(RELOC_STRUCT.size)
+        if len(data) != RELOC_STRUCT.size:
+            raise ValueError("File too short while reading relocations")
+        offset, raw_name, type_code = RELOC_STRUCT.unpack(data)
+        name = raw_name.split(b"\0", 1)[0].decode("utf-8", errors="replace")
+        relocs.append(
+            {
+                "offset": offset,
+                "symbol": name,
+                "type": RELOC_TYPES.get(type_code, f"UNKNOWN({type_code})"),
+            }
+        )
+    return relocs
+
+
+def read_obj(path: Path):
+    """Parse a whole LNK1 file into {text, data, symbols, relocs}."""
+    with Path(path).open("rb") as f:
+        magic, text_size, data_size, sym_count, reloc_count = read_header(f)
+        if magic != MAGIC:
+            raise ValueError(f"Bad magic 0x{magic:08X} (expected 0x{MAGIC:08X})")
+        text = f.read(text_size)
+        data = f.read(data_size)
+        if len(text) != text_size or len(data) != data_size:
+            raise ValueError("File too short while reading sections")
+        symbols = read_symbols(f, sym_count)
+        relocs = read_relocs(f, reloc_count)
+    return {"text": text, "data": data, "symbols": symbols, "relocs": relocs}
+
+
+def link_layout(paths, text_base=0, data_base=None, unit=ADDR_UNIT):
+    """Place objects the way mllinker concatenates them.
+
+    All text sections are laid out in link order starting at text_base, then
+    all data sections in link order starting at data_base (default: directly
+    after the last text section). Returns a list of per-object dicts with
+    text/data addresses and sizes plus absolute addresses of defined symbols.
+
+    Sizes and symbol offsets in a .mobj are bytes; addresses (including the
+    bases) are emulator addresses of `unit` bytes each.
+    """
+    objs = [(Path(p), read_obj(p)) for p in paths]
+    addr = text_base
+    layout = []
+    for path, obj in objs:
+        layout.append({"path": path, "obj": obj, "text_addr": addr, "text_size": len(obj["text"])})
+        addr += -(-len(obj["text"]) // unit)
+    addr = addr if data_base is None else data_base
+    for entry in layout:
+        entry["data_addr"] = addr
+        entry["data_size"] = len(entry["obj"]["data"])
+        addr += -(-entry["data_size"] // unit)
+    for entry in layout:
+        entry["symbols"] = []
+        for sym in entry["obj"]["symbols"]:
+            if sym["type"] != "DEFINED":
+                continue
+            base = entry["data_addr"] if sym["section"] == "DATA" else entry["text_addr"]
+            entry["symbols"].append(dict(sym, address=base + sym["offset"] // unit))
+    return layout
+
+
+def _pack_name(name):
+    raw = name.encode("utf-8")
+    if len(raw) > 63:
+        raise ValueError(f"Symbol name too long (max 63 bytes): {name}")
+    return raw
+
+
+def _check_u32(field, value):
+    if not isinstance(value, int) or isinstance(value, bool) or not 0 <= value <= 0xFFFFFFFF:
+        raise ValueError(f"{field} must be an unsigned 32-bit integer, got {value!r}")
+
+
+def build_obj(desc):
+    """Serialize an object description to LNK1 bytes.
+
+    `desc` uses the linker test JSON shape: {"text": [bytes], "data": [bytes],
+    "symbols": [{name, type, section, offset}], "relocs": [{offset,
+    symbol_name, type}]}. Values that do not fit their field raise ValueError
+    naming the field.
+    """
+    text = bytes(desc.get("text", []))
+    data = bytes(desc.get("data", []))
+    symbols = desc.get("symbols", [])
+    relocs = desc.get("relocs", [])
+    parts = [HEADER_STRUCT.pack(MAGIC, len(text), len(data), len(symbols), len(relocs)), text, data]
+    for i, sym in enumerate(symbols):
+        for field in ("type", "section", "offset"):
+            _check_u32(f"symbols[{i}].{field}", sym[field])
+        parts.append(SYMBOL_STRUCT.pack(_pack_name(sym["name"]), sym["type"], sym["section"], sym["offset"]))
+    for i, rel in enumerate(relocs):
+        for field in ("offset", "type"):
+            _check_u32(f"relocs[{i}].{field}", rel[field])
+        parts.append(RELOC_STRUCT.pack(rel["offset"], _pack_name(rel["symbol_name"]), rel["type"]))
+    return b"".join(parts)
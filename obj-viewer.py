@@ -5,63 +5,10 @@ Prints header, symbols, relocations, and a short hex preview of text/data.
 """
 
 import argparse
-import struct
 import sys
 from pathlib import Path
 
-
-MAGIC = 0x4C4E4B31  # "LNK1"
-HEADER_STRUCT = struct.Struct("<LLLLL")     # magic, text_size, data_size, sym_count, reloc_count
-SYMBOL_STRUCT = struct.Struct("<64sLLL")    # name[64], type, section, offset
-RELOC_STRUCT = struct.Struct("<L64sL")      # offset, symbol_name[64], type
-
-SYMBOL_TYPES = {0: "UNDEFINED", 1: "DEFINED"}
-SECTION_TYPES = {0: "TEXT", 1: "DATA"}
-RELOC_TYPES = {0: "ABSOLUTE", 1: "RELATIVE"}
-
-
-def read_header(f):
-    data = f.read(HEADER_STRUCT.size)
-    if len(data) != HEADER_STRUCT.size:
-        raise ValueError("File too short for header")
-    return HEADER_STRUCT.unpack(data)
-
-
-def read_symbols(f, count):
-    symbols = []
-    for _ in range(count):
-        data = f.read(SYMBOL_STRUCT.size)
-        if len(data) != SYMBOL_STRUCT.size:
-            raise ValueError("File too short while reading symbols")
-        raw_name, type_code, section_code, offset = SYMBOL_STRUCT.unpack(data)
-        name = raw_name.split(b"\0", 1)[0].decode("utf-8", errors="replace")
-        symbols.append(
-            {
-                "name": name,
-                "type": SYMBOL_TYPES.get(type_code, f"UNKNOWN({type_code})"),
-                "section": SECTION_TYPES.get(section_code, f"UNKNOWN({section_code})"),
-                "offset": offset,
-            }
-        )
-    return symbols
-
-
-def read_relocs(f, count):
-    relocs = []
-    for _ in range(count):
-        data = f.read(RELOC_STRUCT.size)
-        if len(data) != RELOC_STRUCT.size:
-            raise ValueError("File too short while reading relocations")
-        offset, raw_name, type_code = RELOC_STRUCT.unpack(data)
-        name = raw_name.split(b"\0", 1)[0].decode("utf-8", errors="replace")
-        relocs.append(
-            {
-                "offset": offset,
-                "symbol": name,
-                "type": RELOC_TYPES.get(type_code, f"UNKNOWN({type_code})"),
-            }
-        )
-    return relocs
+from mobj import MAGIC, read_header, read_relocs, read_symbols
 
 
 def hex_preview(buf, max_bytes, width=16):
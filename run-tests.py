@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+Run the mlc, assembler and linker suites through one build phase and one
+worker pool, with a single combined report.
+"""
+
+import argparse
+
+import runner
+from suites import load_suites
+
+if __name__ == "__main__":
+    available = load_suites()
+    parser = argparse.ArgumentParser(description="Run all MyTester suites in one scheduler.")
+    runner.add_arguments(parser)
+    parser.add_argument("--suite", action="append", choices=sorted(available),
+                        help="Suite to run (repeatable; default: all)")
+    args = parser.parse_args()
+
+    suites = [available[name] for name in (args.suite or available)]
+    raise SystemExit(runner.main(suites, args))
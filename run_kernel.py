@@ -2,11 +2,33 @@
 """
 Build and run the sample kernel from MyKernel using the toolchain:
   .mln -> .masm (mlc) -> .mbin/.mobj (myas) -> linked .mbin (mllinker) -> run (myemu)
+
+With --watch, MyKernel/src and asm/stub.masm are polled; on change only the
+changed units are rebuilt, the image is relinked and the emulator relaunched.
+
+Every build writes a link map to MyKernel/build/kernel_linked.map and, when
+MyKernel/size_budget.json (or --budget) exists, fails if the image is over
+budget (see linkmap.py).
+
+With --bench N, the image is built once and the emulator is run N times. Each
+run ends when the emulator halts (exits) or prints output matching --marker;
+a run that exits non-zero or hits --bench-timeout fails the benchmark and
+nothing is recorded. Wall times are measured for every run. Executed
+instruction counts are parsed from the emulator output with --count-pattern.
+The min/median/p95 distribution is appended to outputs/kernel_bench.jsonl
+together with the commit and image hash, and compared against the latest
+run recorded for another commit.
 """
 
 import argparse
+import hashlib
+import json
+import os
+import re
+import select
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
@@ -21,12 +43,18 @@ from tools.project_paths import (
     REPO_ROOT,
 )
 
+from stats import distribution
+
 GREEN = "32"
 RED = "31"
 YELLOW = "33"
 CYAN = "36"
 VERBOSE = False
 
+BENCH_HISTORY = MYTESTER_DIR / "outputs" / "kernel_bench.jsonl"
+# Executed instruction count in emulator output, e.g. "instructions: 1234" or "steps=1234".
+COUNT_PATTERN = r"(?i)\b(?:instructions|instrs|insns|steps|cycles)\b\D{0,3}(\d+)"
+
 def colored(text, color_code):
     return f"\033[{color_code}m{text}\033[0m"
 
@@ -47,10 +75,237 @@ def run(cmd, cwd, description):
         status_line("OK", description, GREEN)
 
 
+def snapshot(paths):
+    """Return {file: mtime_ns} for the given files and every file under the given dirs."""
+    stamps = {}
+    for path in paths:
+        if path.is_dir():
+            for root, _, files in os.walk(path):
+                for name in files:
+                    f = Path(root) / name
+                    try:
+                        stamps[f] = f.stat().st_mtime_ns
+                    except OSError:
+                        pass
+        elif path.exists():
+            stamps[path] = path.stat().st_mtime_ns
+    return stamps
+
+
+def launch_emulator(myemu, linked_bin, repo):
+    status_line("STEP", "run emulator", CYAN)
+    return subprocess.Popen([myemu, "-i", linked_bin], cwd=repo)
+
+
+def stop_emulator(proc):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(timeout=2)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+def watch(build_cmd, myemu, linked_bin, repo, watched, no_run, interval):
+    """Rebuild and relaunch the emulator whenever a watched file changes."""
+    emu = None
+    stamps = None
+    status_line("WATCH", ", ".join(str(p) for p in watched), CYAN)
+    try:
+        while True:
+            current = snapshot(watched)
+            if current != stamps:
+                if stamps is not None:
+                    changed = sorted(str(p) for p in set(current) | set(stamps)
+                                     if current.get(p) != stamps.get(p))
+                    status_line("CHANGE", ", ".join(changed), YELLOW)
+                stamps = current
+                try:
+                    run(build_cmd, cwd=repo, description="rebuild kernel image")
+                except subprocess.CalledProcessError:
+                    status_line("WATCH", "build failed; waiting for changes", YELLOW)
+                else:
+                    if not no_run:
+                        stop_emulator(emu)
+                        emu = launch_emulator(myemu, linked_bin, repo)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        status_line("DONE", "watch stopped", GREEN)
+    finally:
+        stop_emulator(emu)
+
+
+def bench_once(cmd, cwd, marker, count_re, timeout):
+    """Run the emulator once; returns (seconds, instruction count or None, end, output).
+
+    `end` is "halt" (the emulator exited 0), "marker", "timeout" or "exit <code>".
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    chunks = []
+    pending = b""
+    end = None
+
+    def marker_in(lines):
+        return any(marker.search(line.decode(errors="replace")) for line in lines)
+
+    fd = proc.stdout.fileno()
+    try:
+        while end is None:
+            remaining = None if timeout is None else timeout - (time.perf_counter() - start)
+            if remaining is not None and remaining <= 0:
+                end = "timeout"
+                break
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            data = os.read(fd, 65536)
+            if not data:
+                proc.wait()
+                # the last line may lack a trailing newline
+                if marker is not None and pending and marker_in([pending]):
+                    end = "marker"
+                else:
+                    end = "halt" if proc.returncode == 0 else f"exit {proc.returncode}"
+                break
+            chunks.append(data)
+            if marker is not None:
+                lines = (pending + data).split(b"\n")
+                pending = lines.pop()
+                # a prompt-style marker may be printed without a newline
+                if marker_in(lines + [pending]):
+                    end = "marker"
+        elapsed = time.perf_counter() - start
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+    output = b"".join(chunks).decode(errors="replace")
+    count = None
+    for m in count_re.finditer(output):
+        try:
+            count = int(m.group(1))
+        except (TypeError, ValueError):
+            pass
+    return elapsed, count, end, output
+
+
+def git_revision(repo):
+    try:
+        out = subprocess.run(["git", "-C", str(repo), "describe", "--always", "--dirty"],
+                             capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def load_bench_history(path):
+    entries = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return entries
+
+
+def bench(myemu, linked_bin, repo, runs, warmup, marker, count_pattern, timeout, emu_args, history_path):
+    """Run the emulator `runs` times and record the distribution; returns an exit code."""
+    cmd = [str(myemu), "-i", str(linked_bin)] + emu_args
+    marker_re = re.compile(marker) if marker else None
+    count_re = re.compile(count_pattern)
+    status_line("BENCH", f"{runs} run(s), {warmup} warmup; end at {'/' + marker + '/ or ' if marker else ''}halt"
+                f"{f', timeout {timeout}s' if timeout else ''}", CYAN)
+
+    walls = []
+    counts = []
+    ends = {}
+    for i in range(warmup + runs):
+        elapsed, count, end, output = bench_once(cmd, repo, marker_re, count_re, timeout)
+        if end.startswith("exit") or end == "timeout":
+            status_line("FAIL", f"run {i + 1}: {end} after {elapsed:.3f}s", RED)
+            print(output[-2000:])
+            return 1
+        if i < warmup:
+            continue
+        walls.append(elapsed)
+        if count is not None:
+            counts.append(count)
+        ends[end] = ends.get(end, 0) + 1
+        if VERBOSE:
+            status_line("RUN", f"{len(walls)}/{runs}: {elapsed * 1000:.2f} ms"
+                        f"{f', {count} instructions' if count is not None else ''} ({end})", CYAN)
+
+    wall = distribution(walls)
+    record = {
+        "ts": time.time(),
+        "revision": git_revision(repo),
+        "image": str(linked_bin),
+        "image_sha256": hashlib.sha256(Path(linked_bin).read_bytes()).hexdigest(),
+        "image_size": Path(linked_bin).stat().st_size,
+        "emulator_args": emu_args,
+        "marker": marker,
+        "timeout": timeout,
+        "runs": runs,
+        "ends": ends,
+        "wall_s": wall,
+        "instructions": distribution(counts) if len(counts) == runs else None,
+    }
+
+    status_line("WALL", "min {min:.3f} ms, median {median:.3f} ms, p95 {p95:.3f} ms, max {max:.3f} ms".format(
+        **{k: v * 1000 for k, v in wall.items()}), GREEN)
+    if record["instructions"]:
+        ins = record["instructions"]
+        status_line("INSNS", f"min {ins['min']}, median {ins['median']}, p95 {ins['p95']}, max {ins['max']}", GREEN)
+    else:
+        status_line("INSNS", f"no instruction count in emulator output matching /{count_pattern}/", YELLOW)
+
+    previous = [e for e in load_bench_history(history_path)
+                if e.get("marker") == marker and e.get("emulator_args") == emu_args
+                and e.get("revision") != record["revision"]]
+    if previous:
+        last = previous[-1]
+        delta = (wall["median"] / last["wall_s"]["median"] - 1) * 100
+        line = f"vs {last.get('revision') or 'unknown'}: median wall {delta:+.1f}%"
+        if record["instructions"] and last.get("instructions"):
+            line += f", median instructions {record['instructions']['median'] - last['instructions']['median']:+d}"
+        status_line("TREND", line, YELLOW if delta > 5 else GREEN)
+
+    history_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(history_path, "a") as f:
+        f.write(json.dumps(record) + "\n")
+    status_line("DONE", f"benchmark recorded in {history_path}", GREEN)
+    return 0
+
+
 def main():
     parser = argparse.ArgumentParser(description="Build and run MyKernel sample.")
     parser.add_argument("--no-run", action="store_true", help="Build only; skip emulator run.")
     parser.add_argument("--verbose", action="store_true", help="Show executed commands")
+    parser.add_argument("--watch", action="store_true",
+                        help="Rebuild changed units and relaunch the emulator when sources change")
+    parser.add_argument("--interval", type=float, default=0.5, help="Watch poll interval in seconds")
+    parser.add_argument("--bench", type=int, metavar="N",
+                        help="Build once, run the emulator N times and record the boot time distribution")
+    parser.add_argument("--warmup", type=int, default=0, help="Unrecorded runs before --bench runs")
+    parser.add_argument("--marker", help="Regex for an emulator output line that ends a --bench run")
+    parser.add_argument("--bench-timeout", type=float, default=None, metavar="SEC",
+                        help="Stop a --bench run after SEC seconds; a run that times out fails the benchmark")
+    parser.add_argument("--count-pattern", default=COUNT_PATTERN,
+                        help="Regex whose first group is the executed instruction count in emulator output")
+    parser.add_argument("--emu-arg", action="append", default=[], metavar="ARG",
+                        help="Extra emulator argument for --bench runs (repeatable), e.g. an instruction limit")
+    parser.add_argument("--budget", type=Path,
+                        help="JSON size budget for the kernel image (default: MyKernel/size_budget.json if present)")
+    parser.add_argument("--bench-history", type=Path, default=BENCH_HISTORY,
+                        help=f"JSON-lines file of benchmark results (default: {BENCH_HISTORY})")
     args = parser.parse_args()
 
     global VERBOSE
@@ -72,24 +327,51 @@ def main():
     stub_masm = kernel_dir / "asm" / "stub.masm"
 
     linked_bin = build_dir / "kernel_linked.mbin"
+    link_map = build_dir / "kernel_linked.map"
+    budget = args.budget or kernel_dir / "size_budget.json"
 
     build_toolchain = MYTESTER_DIR / "build_toolchain.py"
 
-    # Build kernel using toolchain script (stub must be first for entry point)
-    run([
+    # Build kernel using toolchain script (stub must be first for entry point).
+    # build_toolchain.py skips units whose input is unchanged, so rebuilds are incremental.
+    build_cmd = [
         sys.executable, build_toolchain,
         stub_masm, kernel_ml,
         "-o", linked_bin,
-        "--build-dir", build_dir
-    ], cwd=repo, description="build kernel image")
+        "--build-dir", build_dir,
+        "--map", link_map,
+    ]
+    if args.budget or budget.exists():
+        build_cmd += ["--budget", budget]
+
+    if args.bench is not None and (args.bench < 1 or args.watch or args.no_run):
+        parser.error("--bench needs N >= 1 and cannot be combined with --watch or --no-run")
+
+    if args.bench is not None:
+        try:
+            groups = re.compile(args.count_pattern).groups
+        except re.error as e:
+            parser.error(f"--count-pattern: {e}")
+        if groups != 1:
+            parser.error("--count-pattern must have exactly one capture group (the instruction count)")
+
+    if args.watch:
+        watch(build_cmd, myemu, linked_bin, repo, [kernel_dir / "src", stub_masm], args.no_run, args.interval)
+        return
+
+    run(build_cmd, cwd=repo, description="build kernel image")
 
     if args.no_run:
         status_line("DONE", "build complete; skipped emulator run", GREEN)
         return
 
+    if args.bench is not None:
+        sys.exit(bench(myemu, linked_bin, repo, args.bench, args.warmup, args.marker, args.count_pattern,
+                       args.bench_timeout, args.emu_arg, args.bench_history))
+
     # Run emulator
     run([myemu, "-i", linked_bin], cwd=repo, description="run emulator")
-    status_line("DONE", "kernel run complete; see memory_dump.txt for RAM snapshot", GREEN)
+    status_line("DONE", "kernel run complete; see memory_dump.txt for RAM snapshot (memdump.py converts/diffs it)", GREEN)
 
 
 if __name__ == "__main__":
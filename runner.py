@@ -0,0 +1,308 @@
+"""
+Unified scheduler for the MyTester suites.
+
+All selected suites share one toolchain build phase and one worker pool. A
+suite's cases are queued as soon as the components it needs are ready, so the
+run takes roughly the longest build+test critical path instead of the sum of
+separately built, separately scheduled suites.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.project_paths import MYTESTER_DIR
+
+import events
+import harness
+from harness import CYAN, RED, StepLog, has_failure, print_failure, report, run_step, status_line, was_cancelled
+from toolchain import Toolchain
+
+OUTPUT_DIR = MYTESTER_DIR / "outputs"
+HISTORY_PATH = OUTPUT_DIR / "test_history.json"
+EVENTS_PATH = OUTPUT_DIR / "events.jsonl"
+METRICS_PATH = OUTPUT_DIR / "metrics.json"
+
+
+def load_history():
+    try:
+        return json.loads(HISTORY_PATH.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_history(history, results):
+    """Record pass/fail and run time for every case that completed."""
+    now = time.time()
+    for key, outcomes in results.items():
+        entry = history.setdefault(key, {})
+        entry["last_run"] = now
+        if has_failure(outcomes):
+            entry["status"] = "fail"
+            entry["last_fail"] = now
+        else:
+            entry["status"] = "pass"
+    HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = HISTORY_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(history, indent=2, sort_keys=True))
+    os.replace(tmp, HISTORY_PATH)
+
+
+def history_key(suite, case):
+    return f"{suite.name}/{case[0]}"
+
+
+def prioritize(to_run, history):
+    """Order cases: previously failing first, then inputs edited since their last run."""
+
+    def edited_at(suite, case):
+        mtimes = []
+        for path in suite.inputs(case):
+            try:
+                mtimes.append(path.stat().st_mtime)
+            except OSError:
+                pass
+        return max(mtimes, default=0.0)
+
+    def key(item):
+        suite, case = item
+        entry = history.get(history_key(suite, case), {})
+        edited = edited_at(suite, case)
+        failed_last = entry.get("status") == "fail"
+        edited_since = edited > entry.get("last_run", 0.0)
+        return (not failed_last, not edited_since, -edited)
+
+    return sorted(to_run, key=key)
+
+
+def select_cases(suites, selected):
+    """Return [(suite, case)] for every case, or only the ones named `selected`."""
+    if not selected:
+        return [(suite, case) for suite in suites for case in suite.cases]
+    matches = [(suite, case) for suite in suites for case in suite.find(selected)]
+    if not matches:
+        print(f"[ERROR] Test case '{selected}' not found in testcases.")
+        sys.exit(1)
+    return matches
+
+
+def run_suites(suites, selected=None, clean=False, jobs=None, failfast=False, batch=0,
+               events_path=EVENTS_PATH, metrics_path=METRICS_PATH):
+    """Build the toolchain once and run every selected case in one pool.
+
+    With failfast, previously failing and recently edited cases run first and
+    the first failure is printed immediately, pending cases are cancelled and
+    in-flight case subprocesses are killed.
+    With batch > 1, suites that support it run up to `batch` compatible cases
+    per toolchain invocation.
+    Step/job events are streamed to `events_path` (JSON lines) and latency
+    histograms plus worker utilization are written to `metrics_path`.
+    Returns the process exit code (0 when all cases passed).
+    """
+    to_run = select_cases(suites, selected)
+    history = load_history()
+    if failfast:
+        to_run = prioritize(to_run, history)
+    harness.CANCEL.clear()
+    qualify = len(suites) > 1
+    components = []
+    for suite in suites:
+        components += [c for c in suite.components if c not in components]
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    events.start(events_path)
+    max_workers = max(1, min(len(to_run), jobs or os.cpu_count() or 4))
+    summary = {}
+    try:
+        toolchain = Toolchain(components)
+        build_log = StepLog(OUTPUT_DIR / "BUILD" / "BUILD.log")
+        build_outcomes = []
+
+        def build_runner(cmd, desc, **kw):
+            return run_step(cmd, desc, build_log, build_outcomes, cancellable=False, **kw)
+
+        if clean:
+            status_line("SETUP", "clean toolchain")
+            clean_log = StepLog(OUTPUT_DIR / "CLEAN" / "CLEAN.log")
+            toolchain.clean(lambda cmd, desc: run_step(cmd, desc, clean_log, [], cancellable=False))
+            clean_log.flush()
+
+        status_line("SETUP", f"build toolchain ({', '.join(components)})")
+        status_line("RUN", f"{len(to_run)} case(s)")
+
+        results = {}
+        cancelled = []
+        shown = []
+        waiting = {suite.name: set(suite.components) for suite in suites}
+        failed_components = []
+        lock = threading.Lock()
+        futures = []
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worker")
+        events.emit("run_start", suites=[s.name for s in suites], cases=len(to_run), components=components,
+                    workers=max_workers, batch=batch, failfast=failfast)
+
+        def display_name(suite, case):
+            return f"{suite.name}/{case[0]}" if qualify else case[0]
+
+        def record(suite, case, outcomes):
+            name = display_name(suite, case)
+            with lock:
+                if was_cancelled(outcomes):
+                    cancelled.append(name)
+                    events.emit("case_result", case=name, status="cancelled")
+                    return
+                results[name] = outcomes
+                events.emit("case_result", case=name, status="fail" if has_failure(outcomes) else "pass")
+                if failfast and has_failure(outcomes) and not harness.CANCEL.is_set():
+                    harness.cancel_running()
+                    print_failure(name, outcomes)
+                    shown.append(name)
+                    for future in futures:
+                        future.cancel()
+
+        def crashed(e):
+            return [f"❌ harness error: {type(e).__name__}: {e}"]
+
+        def run_one(suite, case):
+            try:
+                outcomes = suite.run_case(case)
+            except Exception as e:
+                outcomes = crashed(e)
+            record(suite, case, outcomes)
+
+        def run_group(suite, group):
+            done = []
+            try:
+                for case, outcomes in suite.run_batch(group):
+                    record(suite, case, outcomes)
+                    done.append(case)
+            except Exception as e:
+                for case in group:
+                    if case not in done:
+                        record(suite, case, crashed(e))
+
+        def run_job(job, queued_at, fn, *args):
+            started = events.job_start(job, queued_at)
+            try:
+                fn(*args)
+            finally:
+                events.job_finish(job, started)
+
+        def schedule(suite, cases):
+            if batch > 1 and suite.plan_batches:
+                groups = suite.plan_batches(cases, batch)
+            else:
+                groups = [[case] for case in cases]
+            for group in groups:
+                names = [display_name(suite, case) for case in group]
+                if len(group) == 1:
+                    job, fn, arg = names[0], run_one, group[0]
+                else:
+                    job, fn, arg = f"{names[0]}+{len(group) - 1}", run_group, group
+                queued_at = events.job_queued(job, names)
+                futures.append(executor.submit(run_job, job, queued_at, fn, suite, arg))
+
+        def on_component(name, action, seconds):
+            if harness.VERBOSE or action != "fresh":
+                status_line("BUILD", f"{name}: {action} ({seconds:.1f}s)", RED if action == "failed" else CYAN)
+            events.emit("component", component=name, action=action, duration_s=round(seconds, 6))
+            with lock:
+                if action == "failed":
+                    failed_components.append(name)
+                for suite in suites:
+                    pending = waiting[suite.name]
+                    if name not in pending:
+                        continue
+                    pending.discard(name)
+                    if pending:
+                        continue
+                    broken = [c for c in suite.components if c in failed_components]
+                    mine = [case for s, case in to_run if s is suite]
+                    if broken:
+                        for case in mine:
+                            results[display_name(suite, case)] = [f"❌ toolchain build failed: {', '.join(broken)}"]
+                    elif harness.CANCEL.is_set():
+                        cancelled.extend(display_name(suite, case) for case in mine)
+                    else:
+                        schedule(suite, mine)
+
+        try:
+            try:
+                toolchain.build(build_runner, jobs=jobs, on_component=on_component)
+            finally:
+                build_log.flush()
+            toolchain.write_manifest(OUTPUT_DIR / "toolchain_manifest.json")
+            for future in list(futures):
+                if future.cancelled():
+                    continue
+                future.result()
+        finally:
+            executor.shutdown(wait=True)
+
+        with lock:
+            cancelled += [
+                display_name(s, case) for s, case in to_run
+                if display_name(s, case) not in results and display_name(s, case) not in cancelled
+            ]
+            save_history(history, {
+                history_key(s, case): results[display_name(s, case)]
+                for s, case in to_run if display_name(s, case) in results
+            })
+
+        if failed_components:
+            status_line("FATAL", f"build failed: {', '.join(failed_components)}", RED)
+            for outcome in build_outcomes:
+                print(f"  {outcome}")
+
+        failures = report(results, cancelled, shown)
+        summary.update(passed=len(results) - len(failures), failed=len(failures), cancelled=len(cancelled))
+        events.emit("run_end", failed_components=failed_components, **summary)
+        return 1 if failures or failed_components else 0
+    except BaseException as e:
+        summary["aborted"] = f"{type(e).__name__}: {e}"
+        events.emit("run_aborted", error=summary["aborted"])
+        raise
+    finally:
+        events.finish(metrics_path, max_workers, **summary)
+
+
+def add_arguments(parser):
+    """Register the options shared by run-tests.py and the per-suite scripts."""
+    parser.add_argument("test", nargs="?", help="Optional test case name or source filename")
+    parser.add_argument("--verbose", action="store_true", help="Show step-by-step command progress")
+    parser.add_argument("--clean", action="store_true", help="Run make clean before building the toolchain")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker and make job count (default: CPU count)")
+    parser.add_argument("--artifacts", choices=harness.ARTIFACT_MODES,
+                        default=os.environ.get("MYTESTER_ARTIFACTS", harness.ARTIFACT_MODE),
+                        help="disk: keep all intermediates in outputs/; "
+                             "tmpfs: stage in RAM and keep only failing cases (env: MYTESTER_ARTIFACTS)")
+    parser.add_argument("--failfast", action="store_true",
+                        help="Run previously failing/recently edited cases first and stop at the first failure")
+    parser.add_argument("--batch", type=int, default=int(os.environ.get("MYTESTER_BATCH", "0")), metavar="N",
+                        help="Pack up to N compatible small cases into one linked image per emulator run; "
+                             "failed batches fall back to per-case runs (env: MYTESTER_BATCH)")
+    parser.add_argument("--events", type=Path, default=EVENTS_PATH, metavar="PATH",
+                        help=f"JSON-lines step/job event stream (default: {EVENTS_PATH})")
+    parser.add_argument("--metrics", type=Path, default=METRICS_PATH, metavar="PATH",
+                        help=f"End-of-run latency histograms and worker utilization (default: {METRICS_PATH})")
+
+
+def main(suites, args):
+    """Apply parsed shared options and run `suites`; returns the exit code."""
+    harness.VERBOSE = args.verbose
+    harness.ARTIFACT_MODE = args.artifacts
+
+    if args.test:
+        base, ext = os.path.splitext(args.test)
+        selected = base if ext else args.test
+    else:
+        selected = None
+
+    return run_suites(suites, selected, clean=args.clean, jobs=args.jobs, failfast=args.failfast,
+                       batch=args.batch, events_path=args.events, metrics_path=args.metrics)
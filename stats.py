@@ -0,0 +1,21 @@
+"""
+Small statistics helpers shared by the harness metrics and the kernel runner.
+"""
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, -(-len(sorted_samples) * pct // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+def distribution(values):
+    """min/median/p95/max/mean of a non-empty list of numbers."""
+    values = sorted(values)
+    return {
+        "min": values[0],
+        "median": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "max": values[-1],
+        "mean": sum(values) / len(values),
+    }
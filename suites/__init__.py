@@ -0,0 +1,32 @@
+"""
+Pluggable suite definitions for the unified runner.
+
+A suite names the toolchain components it needs, lists its cases (tuples whose
+first element is the case name) and provides run_case(case) -> outcomes.
+The optional inputs(case) -> [Path] lets the runner prioritise recently
+edited cases.
+
+Suites that can run several cases in one toolchain invocation also provide
+plan_batches(cases, size) -> [[case]] and run_batch(cases) -> [(case, outcomes)].
+"""
+
+
+class Suite:
+    def __init__(self, name, components, cases, run_case, inputs=None, plan_batches=None, run_batch=None):
+        self.name = name
+        self.components = list(components)
+        self.cases = list(cases)
+        self.run_case = run_case
+        self.inputs = inputs or (lambda case: [])
+        self.plan_batches = plan_batches
+        self.run_batch = run_batch
+
+    def find(self, selected):
+        return [c for c in self.cases if c[0] == selected]
+
+
+def load_suites():
+    """Return {name: Suite} for every built-in suite."""
+    from suites import asm, linker, mlc
+
+    return {suite.name: suite for suite in (mlc.SUITE, asm.SUITE, linker.SUITE)}
@@ -0,0 +1,78 @@
+"""Assembler suite: .masm -> myas -> myemu register check."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from tools.project_paths import MYASSEMBLER_DIR, MYEMULATOR_DIR, MYTESTER_DIR
+
+from harness import CaseArtifacts, run_step
+from suites import Suite
+
+INPUT_DIR = MYTESTER_DIR / "inputs"
+OUTPUT_DIR = MYTESTER_DIR / "outputs"
+
+ASM_PATH = MYASSEMBLER_DIR / "build/myas"
+EMU_PATH = MYEMULATOR_DIR / "build/myemu"
+
+# Test cases: (asm file basename, register to check, expected value)
+testcases = [
+    #("simpleFunc", "R1", 15),
+    #("simpleCondition", "R1", 328),
+    #("simpleFor", "R1", 5),
+    #("simplePointer", "R1", 12),
+    #("simpleBinop", "R1", 3),
+    #("simpleWhile", "R1", 15),
+    #("complexWhile", "R1", 16),
+    ("simpleChar", "R1", 72),
+    #("simpleStruct", "R1", 10),
+]
+
+
+def run_test(basename, reg, expected):
+    """Run a test case in its artifact dir; failing cases keep outputs/<basename>.*"""
+    artifacts = CaseArtifacts(basename, OUTPUT_DIR)
+    outcomes = []
+    try:
+        run_pipeline(basename, reg, expected, artifacts.dir, artifacts.log, outcomes)
+    finally:
+        artifacts.finish(outcomes)
+    return outcomes
+
+
+def run_pipeline(basename, reg, expected, work_dir, log, outcomes):
+    """Run the test pipeline: ASM -> BIN -> Emulator"""
+    asm_path = INPUT_DIR / f"{basename}.masm"
+    bin_path = work_dir / f"{basename}.bin"
+
+    # Step 1: Assemble ASM -> BIN
+    if run_step([ASM_PATH, asm_path, bin_path], f"ASM to BIN: {basename}.masm", log, outcomes) is None:
+        return outcomes
+
+    # Step 2: Run Emulator
+    output = run_step([EMU_PATH, "-i", bin_path, "--reg", reg], f"Run Emulator: {basename}.bin", log, outcomes)
+    if output is None:
+        outcomes.append("❌ Emulator execution failed")
+        return outcomes
+
+    # Extract the last line and check if it matches the expected value
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    if not lines:
+        outcomes.append("❌ No output from emulator")
+        return outcomes
+    try:
+        actual = int(lines[-1])
+        if actual == expected:
+            outcomes.append(f"✅ {reg} = {actual} (expected)")
+        else:
+            outcomes.append(f"❌ {reg} = {actual}, expected {expected}")
+    except Exception as e:
+        outcomes.append(f"❌ Failed to parse reg value: '{lines[-1]}' ({e})")
+    return outcomes
+
+
+SUITE = Suite(
+    "as", ["myas", "myemu"], testcases, lambda case: run_test(*case),
+    inputs=lambda case: [INPUT_DIR / f"{case[0]}.masm"],
+)
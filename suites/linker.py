@@ -0,0 +1,88 @@
+"""Linker suite: JSON object descriptions -> in-process LNK1 objects -> mllinker."""
+
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from tools.project_paths import MYTESTER_DIR
+
+from harness import CaseArtifacts, run_step
+from mobj import build_obj
+from suites import Suite
+from toolchain import COMPONENTS
+
+INPUT_DIR = MYTESTER_DIR / "inputs/linker"
+OUTPUT_DIR = MYTESTER_DIR / "outputs/linker"
+
+# The binary the shared toolchain build produces for the suite's "mllinker" component.
+LINKER_EXE = COMPONENTS["mllinker"][2]
+OBJ_CACHE_DIR = OUTPUT_DIR / "obj_cache"
+OBJ_FORMAT = b"LNK1/1\0"  # bump when build_obj output changes to invalidate the cache
+
+# Test cases: (name, list of JSON inputs)
+testcases = [
+    ("test_basic", ["test_A.json", "test_B.json"]),
+]
+
+
+def generate_obj(input_path):
+    """Return the cached LNK1 object for a JSON description, generating it if needed.
+
+    Objects are keyed by the JSON file's content hash, so identical inputs
+    shared between cases are generated once and reused across runs.
+    """
+    raw = input_path.read_bytes()
+    digest = hashlib.sha256(OBJ_FORMAT + raw).hexdigest()
+    obj_path = OBJ_CACHE_DIR / f"{digest[:2]}" / f"{digest}.obj"
+    if obj_path.exists():
+        return obj_path
+    obj_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = obj_path.with_suffix(f".{os.getpid()}.{id(raw)}.tmp")
+    tmp.write_bytes(build_obj(json.loads(raw)))
+    os.replace(tmp, obj_path)
+    return obj_path
+
+
+def run_test(test_name, json_inputs):
+    """Run a test case in its artifact dir; failing cases keep outputs/linker/"""
+    artifacts = CaseArtifacts(test_name, OUTPUT_DIR)
+    outcomes = []
+    try:
+        run_pipeline(test_name, json_inputs, artifacts.dir, artifacts.log, outcomes)
+    finally:
+        artifacts.finish(outcomes)
+    return outcomes
+
+
+def run_pipeline(test_name, json_inputs, work_dir, log, outcomes):
+    """Generate objects from JSON, then link them"""
+    obj_files = []
+
+    # 1. Generate Object Files (in-process, cached by content hash)
+    for json_file in json_inputs:
+        try:
+            output_obj = generate_obj(INPUT_DIR / json_file)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.write(f"\n[FAILED] Generate {json_file}: {e}\n")
+            outcomes.append(f"❌ Generate {json_file.replace('.json', '.obj')}: {e}")
+            return outcomes
+        log.write(f"\n--- Generate {json_file} ---\nObject: {output_obj}\n")
+        obj_files.append(output_obj)
+
+    # 2. Link
+    output_bin = work_dir / f"{test_name}.bin"
+    if run_step([LINKER_EXE, output_bin] + obj_files, f"Link to {test_name}.bin", log, outcomes) is None:
+        return outcomes
+
+    outcomes.append(f"✅ linked {len(obj_files)} object(s)")
+    return outcomes
+
+
+SUITE = Suite(
+    "linker", ["mllinker"], testcases, lambda case: run_test(*case),
+    inputs=lambda case: [INPUT_DIR / name for name in case[1]],
+)
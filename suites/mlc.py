@@ -0,0 +1,434 @@
+"""MyLang compiler suite: per-source mlc/myas -> mllinker -> myemu register check."""
+
+import hashlib
+import os
+import re
+import shutil
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+
+from tools.project_paths import (
+    MYASSEMBLER_DIR,
+    MYEMULATOR_DIR,
+    MYLANGCOMPILER_DIR,
+    MYLINKER_DIR,
+    MYTESTER_DIR,
+)
+
+from expectations import ExpectIndex, describe
+from harness import RED, YELLOW, CaseArtifacts, fmt_hex, run_step, status_line
+import events
+import harness
+from memdump import Snapshot
+from mobj import ADDR_UNIT, link_layout
+from suites import Suite
+
+INPUT_DIR = MYTESTER_DIR / "inputs"
+OUTPUT_DIR = MYTESTER_DIR / "outputs"
+
+CC_PATH = MYLANGCOMPILER_DIR / "mlc"
+ASM_PATH = MYASSEMBLER_DIR / "build/myas"
+LINKER_PATH = MYLINKER_DIR / "mllinker"
+EMU_PATH = MYEMULATOR_DIR / "build/myemu"
+EMU_TIMEOUT_SEC = float(os.environ.get("EMU_TIMEOUT_SEC", "8"))
+MEMORY_DUMP = "memory_dump.txt"
+EXPECT_INDEX = ExpectIndex(OUTPUT_DIR / "expect_index.json")
+
+# Test cases: (basename, sources list, register to check, expected value).
+# Further register/memory expectations are read from "// expect:" comments in
+# the sources (see expectations.py) and checked in the same emulator run.
+testcases = [
+    ("simpleFunc", ["simpleFunc.mln"], "R1", 15),
+    ("simpleCondition", ["simpleCondition.mln"], "R1", 328),
+    ("simpleFor", ["simpleFor.mln"], "R1", 5),
+    ("simplePointer", ["simplePointer.mln"], "R1", 14),
+    ("simpleBinop", ["simpleBinop.mln"], "R1", 3),
+    ("simpleWhile", ["simpleWhile.mln"], "R1", 15),
+    ("complexWhile", ["complexWhile.mln"], "R1", 16),
+    ("simpleChar", ["simpleChar.mln"], "R1", 72),
+    ("intWidth32", ["intWidth32.mln"], "R1", 20),
+    ("simpleStruct", ["simpleStruct.mln"], "R1", 10),
+    ("arrayInit", ["arrayInit.mln"], "R1", 106),
+    ("multiArray", ["multiArray.mln"], "R1", 6),
+    ("arraySizeof", ["arraySizeof.mln"], "R1", 24),
+    ("testDoWhile", ["testDoWhile.mln"], "R1", 10),
+    ("testBitwise", ["testBitwise.mln"], "R1", 29),
+    ("testOps", ["testOps.mln"], "R1", 10),
+    ("testTernary", ["testTernary.mln"], "R1", 8),
+    ("testTypedef", ["testTypedef.mln"], "R1", 1),
+    ("longProgram", ["longProgram.mln"], "R1", 77),
+    ("complex_ops", ["complex_ops.mln"], "R1", 188),
+    ("multiInclude", ["multiInclude.mln", "multiInclude_part1.mln", "multiInclude_part2.mln"], "R1", 11),
+    ("multiInclude_complex", ["multiInclude_complex.mln", "multiInclude_midA.mln", "multiInclude_midB.mln", "multiInclude_shared.mln"], "R1", 21),
+    ("testStmtExpr", ["testStmtExpr.mln"], "R1", 5),
+    ("testCaseExpr", ["testCaseExpr.mln"], "R1", 30),
+    ("testCaseStructArrow", ["testCaseStructArrow.mln"], "R1", 42),
+    ("testCaseComplex", ["testCaseComplex.mln"], "R1", 400),
+    ("testCaseExprRef", ["testCaseExprRef.mln"], "R1", 100),
+    ("nestedCaseArrow", ["nestedCaseArrow.mln"], "R1", 10),
+    ("packageSample", ["pkg_main.mln", "pkg_math.mln"], "R1", 20),
+    ("functionLiteral", ["functionLiteral.mln"], "R1", 10),
+    ("localFunctionLiteral", ["localFunctionLiteral.mln"], "R1", 10),
+    ("nestedFunctionLiteral", ["nestedFunctionLiteral.mln"], "R1", 6),
+    ("globalInit", ["globalInit.mln"], "R1", 42),
+    ("testGlobalScalar", ["testGlobalScalar.mln"], "R1", 105),
+    ("globalUninit", ["globalUninit.mln"], "R1", 83),
+]
+
+
+def case_expectations(sources, reg, expected):
+    """The case's own register check plus every inline expectation of its sources."""
+    found = [{"kind": "reg", "target": reg, "value": expected}]
+    for src in sources:
+        for exp in EXPECT_INDEX.lookup(INPUT_DIR / src):
+            if exp not in found:
+                found.append(exp)
+    EXPECT_INDEX.save()
+    return found
+
+
+def run_test(basename, sources, reg, expected):
+    """Run a test case in its artifact dir; failing cases keep outputs/<basename>/"""
+    artifacts = CaseArtifacts(basename, OUTPUT_DIR / basename, own_dir=True)
+    outcomes = []
+    try:
+        try:
+            expects = case_expectations(sources, reg, expected)
+        except (OSError, ValueError) as e:
+            outcomes.append(f"❌ Bad expectations: {e}")
+        else:
+            run_pipeline(basename, sources, expects, artifacts.dir, artifacts.log, outcomes)
+    finally:
+        artifacts.finish(outcomes)
+    return outcomes
+
+
+def check_registers(output, regs, outcomes):
+    """Match the last len(regs) output lines against the register expectations, in order.
+
+    Both sides are compared as 32-bit values, so R1 = -1 matches 0xffffffff.
+    """
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    if len(lines) < len(regs):
+        outcomes.append("❌ No output from emulator" if not lines else
+                        f"❌ Expected {len(regs)} register values, got {len(lines)} line(s)")
+        return
+    for exp, line in zip(regs, lines[-len(regs):]):
+        reg = exp["target"]
+        try:
+            # Accept decimal or hex (e.g., "0x1f"), optionally prefixed by "R1 ="
+            actual = int(line.split()[-1], 0)
+        except Exception as e:
+            outcomes.append(f"❌ Failed to parse reg value: '{line}' ({e})")
+            continue
+        actual &= 0xFFFFFFFF
+        expected = exp["value"] & 0xFFFFFFFF
+        if actual == expected:
+            outcomes.append(f"✅ {reg} = {fmt_hex(actual)} (expected)")
+        else:
+            outcomes.append(f"❌ {reg} = {fmt_hex(actual)}, expected {fmt_hex(expected)}")
+
+
+def check_memory(dump_path, obj_paths, mems, outcomes):
+    """Check memory/symbol expectations against the emulator's memory dump."""
+    if not dump_path.exists():
+        outcomes.append(f"❌ {dump_path.name} not written; cannot check {', '.join(describe(e) for e in mems)}")
+        return
+    try:
+        snap = Snapshot(dump_path)
+    except (OSError, ValueError) as e:
+        outcomes.append(f"❌ Cannot read {dump_path.name}: {e}")
+        return
+    symbols = {}
+    if any(e["kind"] == "sym" for e in mems):
+        for entry in link_layout(obj_paths):
+            for sym in entry["symbols"]:
+                symbols.setdefault(sym["name"], sym["address"])
+    for exp in mems:
+        if exp["kind"] == "sym":
+            if exp["target"] not in symbols:
+                outcomes.append(f"❌ {describe(exp)}: symbol not defined")
+                continue
+            addr = symbols[exp["target"]] + exp["offset"]
+        else:
+            addr = exp["target"]
+        mask = (1 << (8 * exp["width"])) - 1
+        actual = int.from_bytes(snap.read(addr, exp["width"]), "little")
+        if actual == exp["value"] & mask:
+            outcomes.append(f"✅ {describe(exp)} = {fmt_hex(actual)} (expected)")
+        else:
+            outcomes.append(f"❌ {describe(exp)} = {fmt_hex(actual)}, expected {fmt_hex(exp['value'] & mask)}")
+
+
+def run_pipeline(basename, sources, expects, test_dir, log, outcomes):
+    """Run the full pipeline for a single test case: per-source CC/AS -> Linker -> Emulator"""
+    obj_paths = []
+    bin_path = test_dir / f"{basename}.mbin"
+
+    for src in sources:
+        src_path = INPUT_DIR / src
+        stem = src_path.stem
+        asm_path = test_dir / f"{basename}__{stem}.masm"
+        bin_prelink_path = test_dir / f"{basename}__{stem}.prelink.mbin"
+        obj_path = test_dir / f"{basename}__{stem}.mobj"
+
+        if run_step([CC_PATH, src_path, asm_path], f"C to ASM: {src}", log, outcomes, cwd=test_dir) is None:
+            return outcomes
+
+        if run_step([ASM_PATH, asm_path, bin_prelink_path, "--obj", obj_path], f"ASM to OBJ: {src}", log, outcomes, cwd=test_dir) is None:
+            return outcomes
+
+        obj_paths.append(obj_path)
+
+    if run_step([LINKER_PATH, bin_path] + obj_paths, f"Link MOBJ to MBIN: {basename}", log, outcomes, cwd=test_dir) is None:
+        return outcomes
+
+    regs = [e for e in expects if e["kind"] == "reg"]
+    mems = [e for e in expects if e["kind"] != "reg"]
+    dump_path = test_dir / MEMORY_DUMP
+    if mems and dump_path.exists():
+        dump_path.unlink()
+
+    # Run Emulator once for all register and memory expectations
+    emu_cmd = [str(EMU_PATH), "-i", str(bin_path)]
+    for exp in regs:
+        emu_cmd += ["--reg", exp["target"]]
+    if harness.VERBOSE:
+        status_line("EMU", " ".join(emu_cmd), YELLOW)
+    output = run_step(emu_cmd, f"Run Emulator: {basename}.mbin", log, outcomes, timeout=EMU_TIMEOUT_SEC, cwd=test_dir)
+
+    if output is None:
+        outcomes.append("❌ Emulator execution failed")
+        return outcomes
+
+    check_registers(output, regs, outcomes)
+    if mems:
+        check_memory(dump_path, obj_paths, mems, outcomes)
+    return outcomes
+
+
+# Batching: several small single-file cases are compiled into one image whose
+# main() calls each case's renamed main and stores the result in a global
+# table, so a batch costs one mlc/myas/mllinker/myemu run instead of one each.
+BATCH_RESULTS = "__batch_results"
+_MAIN_RE = re.compile(r"\bmain(\s*\()")
+_TOKEN_RE = re.compile(r"//[^\n]*|/\*.*?\*/|'(?:\\.|[^'\\])'|\"(?:\\.|[^\"\\])*\"|[A-Za-z_]\w*|[{}()]", re.S)
+# Reading results back relies on the link layout and dump format (see
+# check_memory). If that fails once it will fail for every batch, so batching
+# is switched off for the rest of the run instead of silently falling back.
+_batch_lock = threading.Lock()
+_batch_state = {"disabled": None, "warned": False}
+_KEYWORDS = {
+    "i8", "i16", "i32", "i64", "u8", "u16", "u32", "u64", "char", "void", "typedef", "struct",
+    "union", "enum", "export", "extern", "static", "const", "sizeof", "main",
+}
+
+
+def top_level_names(text):
+    """Identifiers appearing outside function bodies and parameter lists."""
+    names = set()
+    braces = parens = 0
+    for tok in _TOKEN_RE.findall(text):
+        if tok == "{":
+            braces += 1
+        elif tok == "}":
+            braces -= 1
+        elif tok == "(":
+            parens += 1
+        elif tok == ")":
+            parens -= 1
+        elif braces == 0 and parens == 0 and (tok[0].isalpha() or tok[0] == "_") and tok not in _KEYWORDS:
+            names.add(tok)
+    return names
+
+
+def batch_names(case):
+    """Top-level names of a batchable case, or None when it must run alone.
+
+    Batchable cases have one source without package/import and no
+    expectations besides their own register check.
+    """
+    basename, sources, reg, expected = case
+    if len(sources) != 1 or reg != "R1":
+        return None
+    try:
+        text = (INPUT_DIR / sources[0]).read_text()
+        if len(case_expectations(sources, reg, expected)) > 1:
+            return None
+    except (OSError, ValueError):
+        return None
+    if re.search(r"^\s*(package|import)\b", text, re.M) or not _MAIN_RE.search(text):
+        return None
+    return top_level_names(text)
+
+
+def plan_batches(cases, size):
+    """Group cases into batches of at most `size` with disjoint top-level names."""
+    with _batch_lock:
+        _batch_state.update(disabled=None, warned=False)
+    groups = []
+    for case in cases:
+        names = batch_names(case)
+        if names is None:
+            groups.append(([case], None))
+            continue
+        for group, used in groups:
+            if used is not None and len(group) < size and not used & names:
+                group.append(case)
+                used |= names
+                break
+        else:
+            groups.append(([case], set(names)))
+    return [group for group, _ in groups]
+
+
+def batch_source(cases):
+    """One .mln source containing every case with main renamed, plus the driver."""
+    parts = [f"i32 {BATCH_RESULTS}[{len(cases)}];\n"]
+    calls = []
+    for k, (basename, sources, _, _) in enumerate(cases):
+        text = (INPUT_DIR / sources[0]).read_text()
+        parts.append(f"// ---- {basename} ({sources[0]}) ----\n" + _MAIN_RE.sub(rf"__case_{k}_main\1", text))
+        calls.append(f"    {BATCH_RESULTS}[{k}] = __case_{k}_main();")
+    parts.append("i32 main() {\n" + "\n".join(calls) + f"\n    return {len(cases)};\n}}\n")
+    return "\n".join(parts)
+
+
+def run_batch(cases):
+    """Run cases as one linked image; returns [(case, outcomes)].
+
+    If the batch does not build or run, every case is rerun on its own; a case
+    whose batched result is wrong is rerun on its own to confirm the failure.
+    Fallbacks and mismatch reruns are counted in the run metrics and emitted
+    as events, and the first fallback is reported; if the results table cannot
+    be read back (or none of its values match), batching is disabled for the
+    rest of the run.
+    """
+    with _batch_lock:
+        disabled = _batch_state["disabled"]
+    if disabled:
+        events.count("batch_skipped")
+        return [(case, run_test(*case)) for case in cases]
+
+    digest = hashlib.sha1("\0".join(case[0] for case in cases).encode()).hexdigest()[:8]
+    name = f"batch_{digest}"
+    artifacts = CaseArtifacts(name, OUTPUT_DIR / name, own_dir=True)
+    outcomes = []
+    values = stage = None
+    try:
+        values, stage = run_batch_pipeline(name, cases, artifacts.dir, artifacts.log, outcomes)
+    finally:
+        artifacts.finish(outcomes)
+
+    events.count("batches")
+    if values is None:
+        if harness.CANCEL.is_set():
+            return [(case, outcomes) for case in cases]
+        reason = next((o.removeprefix("❌ ") for o in outcomes if o.startswith("❌")), "unknown")
+        events.count("batch_fallbacks")
+        events.emit("batch_fallback", batch=name, stage=stage, reason=reason, cases=[c[0] for c in cases])
+        with _batch_lock:
+            first = not _batch_state["warned"]
+            _batch_state["warned"] = True
+            if stage == "read":
+                _batch_state["disabled"] = reason
+        if stage == "read":
+            status_line("BATCH", f"cannot read {BATCH_RESULTS} back ({reason}); batching disabled for this run, "
+                        f"log: {artifacts.log.path}", RED)
+        elif first or harness.VERBOSE:
+            status_line("BATCH", f"{name} failed ({reason}); running {len(cases)} case(s) individually "
+                        f"(further fallbacks are counted in metrics.json)", YELLOW)
+        return [(case, run_test(*case)) for case in cases]
+
+    results = []
+    reruns = []
+    for case, actual in zip(cases, values):
+        basename, _, reg, expected = case
+        if actual == expected & 0xFFFFFFFF:
+            if harness.ARTIFACT_MODE == "tmpfs":
+                # like CaseArtifacts.finish() for a passing case: drop output of an earlier failure
+                shutil.rmtree(OUTPUT_DIR / basename, ignore_errors=True)
+            results.append((case, [f"✅ {reg} = {fmt_hex(actual)} (expected, {name})"]))
+        else:
+            reruns.append({"case": basename, "value": actual, "expected": expected & 0xFFFFFFFF})
+            results.append((case, run_test(*case)))
+    if reruns:
+        events.count("batch_mismatch_reruns", len(reruns))
+        events.emit("batch_mismatch", batch=name, reruns=reruns)
+    return results
+
+
+def run_batch_pipeline(name, cases, test_dir, log, outcomes):
+    """Build and run one batch image; returns (results, None) or (None, failed stage).
+
+    The stage is "run" when the image did not build or run to completion and
+    "read" when it ran but the results table could not be read back or none
+    of its values match.
+    """
+    src_path = test_dir / f"{name}.mln"
+    asm_path = test_dir / f"{name}.masm"
+    bin_prelink_path = test_dir / f"{name}.prelink.mbin"
+    obj_path = test_dir / f"{name}.mobj"
+    bin_path = test_dir / f"{name}.mbin"
+    dump_path = test_dir / MEMORY_DUMP
+    try:
+        src_path.write_text(batch_source(cases))
+    except OSError as e:
+        outcomes.append(f"❌ Cannot write batch source: {e}")
+        return None, "run"
+    if dump_path.exists():
+        dump_path.unlink()
+
+    members = ", ".join(case[0] for case in cases)
+    steps = [
+        ([CC_PATH, src_path, asm_path], f"C to ASM: {name} ({members})", None),
+        ([ASM_PATH, asm_path, bin_prelink_path, "--obj", obj_path], f"ASM to OBJ: {name}", None),
+        ([LINKER_PATH, bin_path, obj_path], f"Link MOBJ to MBIN: {name}", None),
+        ([EMU_PATH, "-i", bin_path, "--reg", "R1"], f"Run Emulator: {name}.mbin", EMU_TIMEOUT_SEC * len(cases)),
+    ]
+    output = None
+    for cmd, desc, timeout in steps:
+        output = run_step(cmd, desc, log, outcomes, timeout=timeout, cwd=test_dir)
+        if output is None:
+            return None, "run"
+
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    try:
+        count = int(lines[-1].split()[-1], 0)
+    except (IndexError, ValueError):
+        outcomes.append(f"❌ Failed to parse batch R1: '{lines[-1] if lines else ''}'")
+        return None, "run"
+    if count != len(cases):
+        outcomes.append(f"❌ Batch driver returned {count}, expected {len(cases)}")
+        return None, "run"
+    if not dump_path.exists():
+        outcomes.append(f"❌ {MEMORY_DUMP} not written; cannot read {BATCH_RESULTS}")
+        return None, "read"
+    try:
+        addr = next((sym["address"] for entry in link_layout([obj_path]) for sym in entry["symbols"]
+                     if sym["name"] == BATCH_RESULTS), None)
+        snap = Snapshot(dump_path)
+    except (OSError, ValueError) as e:
+        outcomes.append(f"❌ Cannot read {BATCH_RESULTS}: {e}")
+        return None, "read"
+    if addr is None:
+        outcomes.append(f"❌ {BATCH_RESULTS}: symbol not defined")
+        return None, "read"
+    values = [int.from_bytes(snap.read(addr + k * 4 // ADDR_UNIT, 4), "little") for k in range(len(cases))]
+    if not any(actual == case[3] & 0xFFFFFFFF for actual, case in zip(values, cases)):
+        # Every case failing at once points at the read-back, not the cases.
+        outcomes.append(f"❌ {BATCH_RESULTS} matches none of the {len(cases)} expected results: "
+                        f"{', '.join(fmt_hex(v) for v in values)}")
+        return None, "read"
+    outcomes.append(f"✅ {name}: {len(cases)} case(s) in one run")
+    return values, None
+
+
+SUITE = Suite(
+    "mlc", ["mlc", "myas", "mllinker", "myemu"], testcases, lambda case: run_test(*case),
+    inputs=lambda case: [INPUT_DIR / src for src in case[1]],
+    plan_batches=plan_batches, run_batch=run_batch,
+)
@@ -0,0 +1,319 @@
+"""
+Shared toolchain manager for the MyTester scripts.
+
+Each component (mlc, myas, mllinker, myemu) is fingerprinted by its sources
+(every git-tracked file in its directory) and its built binary. `make` is only invoked for components whose fingerprint
+changed since the last successful build, and `make clean` only runs when
+explicitly requested. Parallel component builds share one GNU make jobserver
+sized to the CPU count.
+"""
+
+import hashlib
+import json
+import os
+import select
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from tools.project_paths import (
+    MYASSEMBLER_DIR,
+    MYEMULATOR_DIR,
+    MYLANGCOMPILER_DIR,
+    MYLINKER_DIR,
+    MYTESTER_DIR,
+)
+
+STATE_PATH = MYTESTER_DIR / "outputs" / "toolchain_state.json"
+
+# name -> (display name, make directory, built binary)
+COMPONENTS = {
+    "mlc": ("MyLangCompiler", MYLANGCOMPILER_DIR, MYLANGCOMPILER_DIR / "mlc"),
+    "myas": ("MyAssembler", MYASSEMBLER_DIR, MYASSEMBLER_DIR / "build" / "myas"),
+    "mllinker": ("MyLinker", MYLINKER_DIR, MYLINKER_DIR / "mllinker"),
+    "myemu": ("MyEmulator", MYEMULATOR_DIR, MYEMULATOR_DIR / "build" / "myemu"),
+}
+
+# Build directories and outputs: skipped when walking a component outside a
+# git work tree, and for untracked files inside one.
+SKIP_DIRS = {"build", "target", "outputs", ".git", "__pycache__"}
+BUILD_SUFFIXES = {".o", ".d", ".a", ".so", ".obj", ".pyc"}
+
+
+def tracked_files(root: Path, skip=()):
+    """Tracked and untracked-but-not-ignored files under root, minus `skip`.
+
+    New sources count before they are added to git. Untracked build outputs
+    missing from .gitignore are left out like in walked_files(). Returns None
+    when root is not in a git work tree.
+    """
+    try:
+        out = subprocess.run(["git", "-C", str(root), "ls-files", "-z", "-t", "--cached", "--others",
+                              "--exclude-standard"], capture_output=True, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if out.returncode != 0:
+        return None
+    skip = {Path(p) for p in skip}
+    files = []
+    for entry in out.stdout.decode(errors="surrogateescape").split("\0"):
+        if not entry:
+            continue
+        tag, rel = entry[:1], Path(entry[2:])
+        if root / rel in skip:
+            continue
+        if tag == "?" and (rel.suffix in BUILD_SUFFIXES or SKIP_DIRS.intersection(rel.parts[:-1])):
+            continue
+        files.append(root / rel)
+    return files
+
+
+def walked_files(root: Path, skip=()):
+    """Every file under root except build directories, build outputs and `skip`."""
+    skip = {Path(p) for p in skip}
+    for dirpath, dirs, files in os.walk(root, topdown=True):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for name in files:
+            path = Path(dirpath) / name
+            if Path(name).suffix not in BUILD_SUFFIXES and path not in skip:
+                yield path
+
+
+def source_fingerprint(root: Path, skip=()) -> str:
+    """Hash (path, size, mtime) of every source file under root.
+
+    Inside a git work tree these are the tracked and untracked, non-ignored
+    files; outside one, every file except build directories and outputs. The
+    paths in `skip` (the component's binary) are never hashed.
+    """
+    h = hashlib.sha256()
+    paths = tracked_files(root, skip)
+    if paths is None:
+        paths = walked_files(root, skip)
+    entries = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        entries.append((str(path.relative_to(root)), st.st_size, st.st_mtime_ns))
+    for rel, size, mtime in sorted(entries):
+        h.update(f"{rel}\0{size}\0{mtime}\n".encode())
+    return h.hexdigest()
+
+
+def component_fingerprint(name):
+    _, make_dir, binary = COMPONENTS[name]
+    return source_fingerprint(make_dir, skip=[binary])
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class JobServer:
+    """A GNU make jobserver owned by the harness.
+
+    The pipe holds one token per job slot. Each top-level make takes a token
+    for its implicit slot before it is started, so the total number of running
+    jobs across all component builds never exceeds `jobs`.
+    """
+
+    def __init__(self, jobs=None):
+        self.jobs = max(1, jobs or os.cpu_count() or 1)
+        self.read_fd, self.write_fd = os.pipe()
+        os.write(self.write_fd, b"+" * self.jobs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for fd in (self.read_fd, self.write_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def acquire(self):
+        # make may switch the shared pipe to O_NONBLOCK, so wait for readiness.
+        while True:
+            select.select([self.read_fd], [], [])
+            try:
+                token = os.read(self.read_fd, 1)
+            except BlockingIOError:
+                continue
+            if token:
+                return token
+
+    def release(self, token=b"+"):
+        os.write(self.write_fd, token)
+
+    @property
+    def pass_fds(self):
+        return (self.read_fd, self.write_fd)
+
+    def env(self):
+        """os.environ with this jobserver added to the user's MAKEFLAGS.
+
+        Other flags (e.g. -s) and command-line variables after " -- " are
+        kept; only -j and jobserver options are replaced.
+        """
+        env = dict(os.environ)
+        flags, sep, variables = f" {env.get('MAKEFLAGS', '')}".partition(" -- ")
+        words = [w for w in flags.split() if not w.startswith(("-j", "--jobs", "--jobserver"))]
+        words += [f"-j{self.jobs}", f"--jobserver-auth={self.read_fd},{self.write_fd}"]
+        env["MAKEFLAGS"] = " ".join(words) + (f" -- {variables}" if sep else "")
+        return env
+
+
+class Toolchain:
+    """Fingerprint-driven build of a subset of the toolchain components."""
+
+    def __init__(self, names=None, state_path=STATE_PATH):
+        self.names = list(names) if names else list(COMPONENTS)
+        for name in self.names:
+            if name not in COMPONENTS:
+                raise ValueError(f"Unknown toolchain component '{name}'")
+        self.state_path = Path(state_path)
+        self.state = self._load_state()
+
+    def _load_state(self):
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+        os.replace(tmp, self.state_path)
+
+    def binary_info(self, name):
+        """Return {path, size, mtime_ns, sha256} for a built binary, or None.
+
+        The hash is reused from the stored state while size and mtime match,
+        so an up-to-date check never re-reads the binaries.
+        """
+        binary = COMPONENTS[name][2]
+        try:
+            st = binary.stat()
+        except OSError:
+            return None
+        cached = self.state.get(name, {}).get("binary")
+        if cached and cached.get("size") == st.st_size and cached.get("mtime_ns") == st.st_mtime_ns:
+            return cached
+        return {
+            "path": str(binary),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "sha256": file_sha256(binary),
+        }
+
+    def is_fresh(self, name):
+        """True when both sources and binary match the last recorded build."""
+        entry = self.state.get(name)
+        if not entry:
+            return False
+        binary = self.binary_info(name)
+        if binary is None or binary.get("sha256") != entry.get("binary", {}).get("sha256"):
+            return False
+        return entry.get("sources") == component_fingerprint(name)
+
+    def _record(self, name, sources):
+        """Store `sources`, the fingerprint taken before make ran, with the new binary.
+
+        Edits saved while make was running therefore leave the component stale.
+        """
+        binary = self.binary_info(name)
+        if binary is None:
+            self.state.pop(name, None)
+            return
+        self.state[name] = {"sources": sources, "binary": binary}
+
+    def clean(self, runner):
+        """Run `make clean` for every selected component and forget its fingerprint."""
+        for name in self.names:
+            label, make_dir, _ = COMPONENTS[name]
+            runner(["make", "-C", str(make_dir), "clean"], f"Clean {label}")
+            self.state.pop(name, None)
+        self._save_state()
+
+    def build(self, runner, jobs=None, on_component=None):
+        """Run `make all` for stale components in parallel under one jobserver.
+
+        `runner(command, description, env=..., pass_fds=...)` executes one make
+        invocation and returns None on failure, like the scripts' run_step.
+        `on_component(name, action, seconds)` is called as soon as each
+        component is known to be fresh, built or failed, so callers can start
+        work that only depends on that component.
+        Returns a list of (name, action, seconds) with action in
+        {"fresh", "built", "failed"}.
+        """
+        stale = [n for n in self.names if not self.is_fresh(n)]
+        actions = {n: ("fresh", 0.0) for n in self.names if n not in stale}
+        if on_component:
+            for name in actions:
+                on_component(name, "fresh", 0.0)
+
+        if stale:
+            with JobServer(jobs) as jobserver:
+                def build_one(name):
+                    label, make_dir, _ = COMPONENTS[name]
+                    token = jobserver.acquire()
+                    start = time.monotonic()
+                    sources = component_fingerprint(name)
+                    try:
+                        out = runner(
+                            ["make", "-C", str(make_dir), "all"],
+                            f"Build {label}",
+                            env=jobserver.env(),
+                            pass_fds=jobserver.pass_fds,
+                        )
+                    finally:
+                        jobserver.release(token)
+                    return name, out is not None, time.monotonic() - start, sources
+
+                with ThreadPoolExecutor(max_workers=len(stale)) as executor:
+                    futures = [executor.submit(build_one, name) for name in stale]
+                    for future in as_completed(futures):
+                        name, ok, seconds, sources = future.result()
+                        if ok:
+                            self._record(name, sources)
+                            actions[name] = ("built", seconds)
+                        else:
+                            self.state.pop(name, None)
+                            actions[name] = ("failed", seconds)
+                        if on_component:
+                            on_component(name, *actions[name])
+            self._save_state()
+        return [(n, *actions[n]) for n in self.names]
+
+    def manifest(self):
+        """Describe the exact binaries selected components resolve to right now."""
+        components = {}
+        for name in self.names:
+            info = self.binary_info(name)
+            components[name] = {
+                "binary": str(COMPONENTS[name][2]),
+                "sha256": info["sha256"] if info else None,
+                "sources": self.state.get(name, {}).get("sources"),
+            }
+        return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "components": components}
+
+    def write_manifest(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.manifest(), indent=2, sort_keys=True))
+        return path